@@ -1,36 +1,351 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.engine import Connection, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 import os
+import queue
+import logging
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
+import orjson
 from dotenv import load_dotenv
 from .models import InterviewQuestion
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database URL from environment
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./interview_platform.db')
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=True if os.getenv('DEBUG') == 'True' else False
+# Async drivers used by the request path
+_ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+def _async_url(url: str) -> str:
+    """
+    Derive the async driver URL from the configured DATABASE_URL
+    """
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL', _async_url(DATABASE_URL))
+
+def _json_serializer(obj: Any) -> str:
+    """
+    orjson-backed serializer for JSON columns (SQLAlchemy expects str)
+    """
+    return orjson.dumps(obj).decode()
+
+# orjson replaces the stdlib json module for JSON column (de)serialization
+_JSON_OPTIONS = {'json_serializer': _json_serializer, 'json_deserializer': orjson.loads}
+
+# Rows per executemany batch; also the insertmanyvalues page size
+INSERT_BATCH_SIZE = 1000
+
+def _engine_options(url: str) -> dict:
+    """
+    Driver-specific options that enable batched executemany INSERTs
+    """
+    driver = make_url(url).drivername
+    options = {'insertmanyvalues_page_size': INSERT_BATCH_SIZE, **_JSON_OPTIONS}
+    if driver in ('postgresql', 'postgresql+psycopg2'):
+        options['executemany_mode'] = 'values_plus_batch'
+    elif driver == 'mssql+pyodbc':
+        options['fast_executemany'] = True
+    elif driver == 'sqlite':
+        options['connect_args'] = {'check_same_thread': False}
+    return options
+
+# Pool sizing for server databases: room for every concurrent request of a
+# worker, with connections recycled before the server drops them as idle
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '20'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '40'))
+DB_POOL_RECYCLE = 1800
+
+def _pool_options(url: str) -> dict:
+    """
+    Connection pool sizing for the async engine; SQLite keeps SQLAlchemy's default pool
+    """
+    if make_url(url).get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': False,
+    }
+
+# WAL lets readers run alongside the writer; NORMAL sync avoids an fsync per commit
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
 )
 
-# Create session factory
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply performance pragmas to every new SQLite connection
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma in _SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+# Create engines: the sync engine handles schema creation and seeding,
+# the async engine serves API requests without blocking the event loop.
+# The sync engine is only used briefly at startup, so it keeps no pool.
+engine = create_engine(DATABASE_URL, poolclass=NullPool, **_engine_options(DATABASE_URL))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    insertmanyvalues_page_size=INSERT_BATCH_SIZE,
+    **_JSON_OPTIONS,
+    **_pool_options(ASYNC_DATABASE_URL)
+)
+
+if make_url(DATABASE_URL).get_backend_name() == 'sqlite':
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, 'connect', _set_sqlite_pragmas)
+
+# SQL echo goes through logging instead of echo=True so it stays off unless DEBUG.
+# Records are handed to a queue so formatting and stderr I/O happen off the request path.
+if os.getenv('DEBUG') == 'True':
+    _sql_log_queue = queue.SimpleQueue()
+    _sql_logger = logging.getLogger('sqlalchemy.engine')
+    _sql_logger.setLevel(logging.INFO)
+    _sql_logger.addHandler(QueueHandler(_sql_log_queue))
+    _sql_logger.propagate = False
+    QueueListener(_sql_log_queue, logging.StreamHandler()).start()
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base for models
 Base = declarative_base()
 
-def get_db():
+# Technical Software Engineering Questions
+_TECHNICAL_QUESTIONS = (
+    {
+        'question_text': 'Explain the difference between REST and GraphQL APIs',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'medium',
+        'category': 'web_development',
+        'expected_keywords': ['REST', 'GraphQL', 'HTTP', 'query', 'endpoint']
+    },
+    {
+        'question_text': 'What is the time complexity of binary search and explain how it works?',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'medium',
+        'category': 'algorithms',
+        'expected_keywords': ['O(log n)', 'divide', 'conquer', 'sorted', 'array']
+    },
+    {
+        'question_text': 'Describe how you would design a URL shortener like bit.ly',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'hard',
+        'category': 'system_design',
+        'expected_keywords': ['hashing', 'database', 'scalability', 'redirect', 'unique']
+    },
+    {
+        'question_text': 'Explain the concept of database indexing and when you would use it',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'medium',
+        'category': 'databases',
+        'expected_keywords': ['B-tree', 'performance', 'query', 'primary key', 'foreign key']
+    },
+    {
+        'question_text': 'What are the SOLID principles in object-oriented programming?',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'medium',
+        'category': 'programming_concepts',
+        'expected_keywords': ['single responsibility', 'open-closed', 'liskov', 'interface', 'dependency']
+    },
+    {
+        'question_text': 'Explain the difference between var, let, and const in JavaScript',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'easy',
+        'category': 'javascript',
+        'expected_keywords': ['scope', 'hoisting', 'block scope', 'immutable', 'redeclaration']
+    },
+    {
+        'question_text': 'What is a closure in JavaScript and provide an example?',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'medium',
+        'category': 'javascript',
+        'expected_keywords': ['closure', 'lexical scope', 'function', 'encapsulation', 'private variables']
+    },
+    {
+        'question_text': 'Explain the concept of microservices architecture',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'hard',
+        'category': 'system_design',
+        'expected_keywords': ['microservices', 'monolith', 'distributed', 'independence', 'communication']
+    },
+    {
+        'question_text': 'What is the difference between SQL and NoSQL databases?',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'easy',
+        'category': 'databases',
+        'expected_keywords': ['SQL', 'NoSQL', 'relational', 'document', 'scalability']
+    },
+    {
+        'question_text': 'Implement a function to reverse a linked list',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'medium',
+        'category': 'data_structures',
+        'expected_keywords': ['linked list', 'pointer', 'iteration', 'recursion', 'reverse']
+    }
+)
+
+# Behavioral Questions
+_BEHAVIORAL_QUESTIONS = (
+    {
+        'question_text': 'Tell me about a time you faced a difficult technical challenge and how you overcame it',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'medium',
+        'category': 'problem_solving',
+        'expected_keywords': ['challenge', 'approach', 'solution', 'result', 'learned']
+    },
+    {
+        'question_text': 'Describe a situation where you had to work with a difficult team member',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'medium',
+        'category': 'teamwork',
+        'expected_keywords': ['communication', 'conflict', 'resolution', 'collaboration', 'outcome']
+    },
+    {
+        'question_text': 'What is your greatest professional achievement to date?',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'easy',
+        'category': 'achievements',
+        'expected_keywords': ['project', 'impact', 'role', 'success', 'proud']
+    },
+    {
+        'question_text': 'Tell me about a time when you had to learn a new technology quickly',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'easy',
+        'category': 'learning_agility',
+        'expected_keywords': ['learning', 'new technology', 'quickly', 'approach', 'application']
+    },
+    {
+        'question_text': 'Describe a time when you had to make a decision with incomplete information',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'hard',
+        'category': 'decision_making',
+        'expected_keywords': ['decision', 'incomplete', 'analysis', 'risk', 'outcome']
+    },
+    {
+        'question_text': 'Tell me about a time when you disagreed with your manager',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'hard',
+        'category': 'conflict_resolution',
+        'expected_keywords': ['disagreement', 'manager', 'perspective', 'resolution', 'professional']
+    },
+    {
+        'question_text': 'Describe a project where you had to collaborate with multiple stakeholders',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'medium',
+        'category': 'collaboration',
+        'expected_keywords': ['stakeholders', 'collaboration', 'communication', 'coordination', 'success']
+    },
+    {
+        'question_text': 'Tell me about a mistake you made and how you handled it',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'medium',
+        'category': 'accountability',
+        'expected_keywords': ['mistake', 'responsibility', 'corrective action', 'learning', 'prevention']
+    }
+)
+
+# Company-specific questions (Google)
+_GOOGLE_QUESTIONS = (
+    {
+        'question_text': 'How would you find the kth largest element in an unsorted array?',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'hard',
+        'company': 'google',
+        'category': 'algorithms',
+        'expected_keywords': ['quickselect', 'heap', 'partition', 'O(n)', 'average']
+    },
+    {
+        'question_text': 'Design a recommendation system for YouTube videos',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'hard', 
+        'company': 'google',
+        'category': 'system_design',
+        'expected_keywords': ['collaborative filtering', 'machine learning', 'scalability', 'personalization']
+    },
+    {
+        'question_text': 'Why do you want to work at Google?',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'easy',
+        'company': 'google',
+        'category': 'company_fit',
+        'expected_keywords': ['innovation', 'scale', 'impact', 'technology', 'mission']
+    }
+)
+
+# Amazon questions
+_AMAZON_QUESTIONS = (
+    {
+        'question_text': 'Design a distributed cache system',
+        'interview_type': 'technical_software',
+        'difficulty_level': 'hard',
+        'company': 'amazon',
+        'category': 'system_design',
+        'expected_keywords': ['distributed', 'cache', 'consistency', 'sharding', 'replication']
+    },
+    {
+        'question_text': 'Tell me about a time when you had to work with limited resources',
+        'interview_type': 'behavioral',
+        'difficulty_level': 'medium',
+        'company': 'amazon',
+        'category': 'frugality',
+        'expected_keywords': ['limited resources', 'creativity', 'efficiency', 'priorities', 'outcome']
+    }
+)
+
+# Combine all questions; every row carries the same keys so they go out as one executemany
+_SEED_QUESTIONS = tuple(
+    {'company': None, **q}
+    for q in _TECHNICAL_QUESTIONS + _BEHAVIORAL_QUESTIONS + _GOOGLE_QUESTIONS + _AMAZON_QUESTIONS
+)
+
+async def get_db() -> AsyncIterator[AsyncSession]:
     """
-    Dependency for FastAPI to get database session
+    Dependency for FastAPI to get an async database session
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield successive lists of at most `size` rows without materializing the input
+    """
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+def bulk_insert(conn: Connection, model, rows: Iterable[Dict[str, Any]], batch_size: int = INSERT_BATCH_SIZE) -> int:
+    """
+    Insert rows in executemany batches, committing after each one so memory
+    stays bounded for large or streamed inputs. Returns the number of rows inserted.
+    """
+    inserted = 0
+    for batch in _chunks(rows, batch_size):
+        conn.execute(insert(model), batch)
+        conn.commit()
+        inserted += len(batch)
+    return inserted
 
 def init_database():
     """
@@ -38,7 +353,7 @@ def init_database():
     """
     from .models import Base
     Base.metadata.create_all(bind=engine)
-    print("Database initialized successfully")
+    logger.info("Database initialized successfully")
 
 def seed_questions():
     """
@@ -46,208 +361,17 @@ def seed_questions():
     """
     from .models import InterviewQuestion
     
-    db = SessionLocal()
-    
-    # Check if questions already exist
-    existing_questions = db.query(InterviewQuestion).first()
-    if existing_questions:
-        print("Questions already seeded")
-        db.close()
-        return
-    
-    # Technical Software Engineering Questions
-    technical_questions = [
-        {
-            'question_text': 'Explain the difference between REST and GraphQL APIs',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'medium',
-            'category': 'web_development',
-            'expected_keywords': ['REST', 'GraphQL', 'HTTP', 'query', 'endpoint']
-        },
-        {
-            'question_text': 'What is the time complexity of binary search and explain how it works?',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'medium',
-            'category': 'algorithms',
-            'expected_keywords': ['O(log n)', 'divide', 'conquer', 'sorted', 'array']
-        },
-        {
-            'question_text': 'Describe how you would design a URL shortener like bit.ly',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'hard',
-            'category': 'system_design',
-            'expected_keywords': ['hashing', 'database', 'scalability', 'redirect', 'unique']
-        },
-        {
-            'question_text': 'Explain the concept of database indexing and when you would use it',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'medium',
-            'category': 'databases',
-            'expected_keywords': ['B-tree', 'performance', 'query', 'primary key', 'foreign key']
-        },
-        {
-            'question_text': 'What are the SOLID principles in object-oriented programming?',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'medium',
-            'category': 'programming_concepts',
-            'expected_keywords': ['single responsibility', 'open-closed', 'liskov', 'interface', 'dependency']
-        },
-        {
-            'question_text': 'Explain the difference between var, let, and const in JavaScript',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'easy',
-            'category': 'javascript',
-            'expected_keywords': ['scope', 'hoisting', 'block scope', 'immutable', 'redeclaration']
-        },
-        {
-            'question_text': 'What is a closure in JavaScript and provide an example?',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'medium',
-            'category': 'javascript',
-            'expected_keywords': ['closure', 'lexical scope', 'function', 'encapsulation', 'private variables']
-        },
-        {
-            'question_text': 'Explain the concept of microservices architecture',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'hard',
-            'category': 'system_design',
-            'expected_keywords': ['microservices', 'monolith', 'distributed', 'independence', 'communication']
-        },
-        {
-            'question_text': 'What is the difference between SQL and NoSQL databases?',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'easy',
-            'category': 'databases',
-            'expected_keywords': ['SQL', 'NoSQL', 'relational', 'document', 'scalability']
-        },
-        {
-            'question_text': 'Implement a function to reverse a linked list',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'medium',
-            'category': 'data_structures',
-            'expected_keywords': ['linked list', 'pointer', 'iteration', 'recursion', 'reverse']
-        }
-    ]
-    
-    # Behavioral Questions
-    behavioral_questions = [
-        {
-            'question_text': 'Tell me about a time you faced a difficult technical challenge and how you overcame it',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'medium',
-            'category': 'problem_solving',
-            'expected_keywords': ['challenge', 'approach', 'solution', 'result', 'learned']
-        },
-        {
-            'question_text': 'Describe a situation where you had to work with a difficult team member',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'medium',
-            'category': 'teamwork',
-            'expected_keywords': ['communication', 'conflict', 'resolution', 'collaboration', 'outcome']
-        },
-        {
-            'question_text': 'What is your greatest professional achievement to date?',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'easy',
-            'category': 'achievements',
-            'expected_keywords': ['project', 'impact', 'role', 'success', 'proud']
-        },
-        {
-            'question_text': 'Tell me about a time when you had to learn a new technology quickly',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'easy',
-            'category': 'learning_agility',
-            'expected_keywords': ['learning', 'new technology', 'quickly', 'approach', 'application']
-        },
-        {
-            'question_text': 'Describe a time when you had to make a decision with incomplete information',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'hard',
-            'category': 'decision_making',
-            'expected_keywords': ['decision', 'incomplete', 'analysis', 'risk', 'outcome']
-        },
-        {
-            'question_text': 'Tell me about a time when you disagreed with your manager',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'hard',
-            'category': 'conflict_resolution',
-            'expected_keywords': ['disagreement', 'manager', 'perspective', 'resolution', 'professional']
-        },
-        {
-            'question_text': 'Describe a project where you had to collaborate with multiple stakeholders',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'medium',
-            'category': 'collaboration',
-            'expected_keywords': ['stakeholders', 'collaboration', 'communication', 'coordination', 'success']
-        },
-        {
-            'question_text': 'Tell me about a mistake you made and how you handled it',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'medium',
-            'category': 'accountability',
-            'expected_keywords': ['mistake', 'responsibility', 'corrective action', 'learning', 'prevention']
-        }
-    ]
-    
-    # Company-specific questions (Google)
-    google_questions = [
-        {
-            'question_text': 'How would you find the kth largest element in an unsorted array?',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'hard',
-            'company': 'google',
-            'category': 'algorithms',
-            'expected_keywords': ['quickselect', 'heap', 'partition', 'O(n)', 'average']
-        },
-        {
-            'question_text': 'Design a recommendation system for YouTube videos',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'hard', 
-            'company': 'google',
-            'category': 'system_design',
-            'expected_keywords': ['collaborative filtering', 'machine learning', 'scalability', 'personalization']
-        },
-        {
-            'question_text': 'Why do you want to work at Google?',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'easy',
-            'company': 'google',
-            'category': 'company_fit',
-            'expected_keywords': ['innovation', 'scale', 'impact', 'technology', 'mission']
-        }
-    ]
-    
-    # Amazon questions
-    amazon_questions = [
-        {
-            'question_text': 'Design a distributed cache system',
-            'interview_type': 'technical_software',
-            'difficulty_level': 'hard',
-            'company': 'amazon',
-            'category': 'system_design',
-            'expected_keywords': ['distributed', 'cache', 'consistency', 'sharding', 'replication']
-        },
-        {
-            'question_text': 'Tell me about a time when you had to work with limited resources',
-            'interview_type': 'behavioral',
-            'difficulty_level': 'medium',
-            'company': 'amazon',
-            'category': 'frugality',
-            'expected_keywords': ['limited resources', 'creativity', 'efficiency', 'priorities', 'outcome']
-        }
-    ]
-    
-    # Combine all questions
-    all_questions = technical_questions + behavioral_questions + google_questions + amazon_questions
-    
-    # Add to database
-    for q_data in all_questions:
-        question = InterviewQuestion(**q_data)
-        db.add(question)
+    # Seeding runs on a Core connection; no Session or unit-of-work is needed
+    with engine.connect() as conn:
+        # Check if questions already exist
+        existing_questions = conn.execute(select(InterviewQuestion.question_id).limit(1)).first()
+        if existing_questions:
+            logger.info("Questions already seeded")
+            return
+        
+        seeded = bulk_insert(conn, InterviewQuestion, _SEED_QUESTIONS)
     
-    db.commit()
-    db.close()
-    print(f"Seeded {len(all_questions)} questions successfully")
+    logger.info(f"Seeded {seeded} questions successfully")
 
 if __name__ == '__main__':
     init_database()
@@ -1,11 +1,63 @@
 import io
+import os
+import codecs
+import hashlib
 import logging
-from typing import Union, BinaryIO
-from PyPDF2 import PdfReader
-from docx import Document
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, Union, BinaryIO
+from charset_normalizer import from_bytes
 
 logger = logging.getLogger(__name__)
 
+# Extracted text for recently parsed files, keyed by content digest. The cache
+# is consulted by the request handler before parsing is sent to a worker
+# process, so hits are shared by every upload the process serves.
+TEXT_CACHE_SIZE = 128
+_text_cache: "OrderedDict[tuple[bytes, str], str]" = OrderedDict()
+_text_cache_lock = threading.Lock()
+
+# Encoding guesses for non-UTF-8 text are only trusted when they decode to
+# mostly clean, language-like text; anything weaker is read as Windows-1252
+DETECTION_MAX_CHAOS = 0.2
+DETECTION_MIN_COHERENCE = 0.2
+FALLBACK_ENCODING = 'cp1252'
+
+def _as_stream(file_content: Union[bytes, BinaryIO]) -> BinaryIO:
+    """
+    Wrap raw bytes in a stream; file-like objects are passed through unchanged
+    """
+    if isinstance(file_content, (bytes, bytearray)):
+        return io.BytesIO(file_content)
+    return file_content
+
+def text_cache_key(file_content: bytes, filename: str) -> Tuple[bytes, str]:
+    """
+    Cache key for a file's extracted text: its content digest and extension
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    return hashlib.blake2b(file_content, digest_size=16).digest(), ext
+
+def get_cached_text(key: Tuple[bytes, str]) -> Optional[str]:
+    """
+    Previously extracted text for key, or None
+    """
+    with _text_cache_lock:
+        text = _text_cache.get(key)
+        if text is not None:
+            _text_cache.move_to_end(key)
+        return text
+
+def cache_text(key: Tuple[bytes, str], text: str) -> None:
+    """
+    Remember extracted text, evicting the least recently used entry when full
+    """
+    with _text_cache_lock:
+        _text_cache[key] = text
+        _text_cache.move_to_end(key)
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+
 class FileParser:
     """
     Utility class for parsing different file formats and extracting text.
@@ -23,17 +75,19 @@ class FileParser:
         Returns:
             Extracted text as string
         """
+        # Parsers are imported on first use to keep worker start-up light
+        import pypdfium2 as pdfium
+        
         try:
-            if isinstance(file_content, bytes):
-                file_content = io.BytesIO(file_content)
+            file_content = _as_stream(file_content)
             
-            reader = PdfReader(file_content)
-            text = ""
+            # PDFium parses content streams natively, much faster than a pure-Python
+            # reader. Pages are read serially: callers already run this in a
+            # process pool, so parsing is parallel across uploads.
+            with pdfium.PdfDocument(file_content) as pdf:
+                pages = [page.get_textpage().get_text_range() for page in pdf]
             
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            return "\n".join(pages).strip()
         
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
@@ -50,24 +104,22 @@ class FileParser:
         Returns:
             Extracted text as string
         """
+        from docx import Document
+        from docx.oxml.ns import qn
+        
         try:
-            if isinstance(file_content, bytes):
-                file_content = io.BytesIO(file_content)
-            
-            doc = Document(file_content)
-            text = ""
+            doc = Document(_as_stream(file_content))
+            w_p, w_t = qn('w:p'), qn('w:t')
             
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            # Walk paragraphs (including those inside table cells) in document
+            # order on the lxml tree, skipping python-docx wrapper objects
+            parts = []
+            for paragraph in doc.element.body.iter(w_p):
+                text = "".join(node.text for node in paragraph.iter(w_t) if node.text)
+                if text:
+                    parts.append(text)
             
-            # Also extract text from tables if any
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
-            
-            return text.strip()
+            return "\n".join(parts).strip()
         
         except Exception as e:
             logger.error(f"Error extracting text from DOCX: {e}")
@@ -85,16 +137,27 @@ class FileParser:
             Extracted text as string
         """
         try:
-            if isinstance(file_content, bytes):
-                # Try different encodings
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    try:
-                        return file_content.decode(encoding).strip()
-                    except UnicodeDecodeError:
-                        continue
-                raise ValueError("Unable to decode text file with common encodings")
-            else:
-                return file_content.read().decode('utf-8').strip()
+            if not isinstance(file_content, (bytes, bytearray)):
+                file_content = file_content.read()
+            
+            # Most resumes are UTF-8: drop a BOM and decode the buffer in place
+            view = memoryview(file_content)
+            if view[:3] == codecs.BOM_UTF8:
+                view = view[3:]
+            try:
+                return str(view, 'utf-8').strip()
+            except UnicodeDecodeError:
+                pass
+            
+            # Otherwise detect the encoding in a single scan instead of trial decoding.
+            # Short Latin-1 text is easily mistaken for UTF-16 or CJK, so weak
+            # guesses fall back to the most common legacy encoding instead.
+            best = from_bytes(file_content).best()
+            if best is not None and (best.bom or (
+                best.chaos <= DETECTION_MAX_CHAOS and best.coherence >= DETECTION_MIN_COHERENCE
+            )):
+                return str(best).strip()
+            return bytes(file_content).decode(FALLBACK_ENCODING, errors='replace').strip()
         
         except Exception as e:
             logger.error(f"Error extracting text from TXT: {e}")
@@ -115,13 +178,16 @@ class FileParser:
         Raises:
             ValueError: If file format is not supported
         """
-        filename_lower = filename.lower()
-        
-        if filename_lower.endswith('.pdf'):
-            return FileParser.extract_text_from_pdf(file_content)
-        elif filename_lower.endswith('.docx'):
-            return FileParser.extract_text_from_docx(file_content)
-        elif filename_lower.endswith('.txt'):
-            return FileParser.extract_text_from_txt(file_content)
-        else:
+        ext = os.path.splitext(filename)[1].lower()
+        parser = _PARSERS.get(ext)
+        if parser is None:
             raise ValueError(f"Unsupported file format. Please upload PDF, DOCX, or TXT files.")
+        
+        return parser(file_content)
+
+# Parser lookup by lowercase file extension
+_PARSERS = {
+    '.pdf': FileParser.extract_text_from_pdf,
+    '.docx': FileParser.extract_text_from_docx,
+    '.txt': FileParser.extract_text_from_txt,
+}
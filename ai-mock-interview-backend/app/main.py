@@ -1,21 +1,33 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
+import os
+import hmac
+import hashlib
+import multiprocessing
 import uuid
+from bisect import bisect_right
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 import asyncio
 import logging
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import func, insert, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import custom modules
-from .database import get_db, SessionLocal, init_database
+from .database import get_db, init_database, engine, async_engine
 from .models import InterviewSession, SessionResponse, FeedbackDetail, InterviewQuestion
-from .ml_service import InterviewAnalyzer
-from .vapi_service import VAPIManager
-from .resume_service import ATSResumeAnalyzer
-from .file_parser import FileParser
-from .file_parser import FileParser
+from .file_parser import FileParser, text_cache_key, get_cached_text, cache_text
+
+if TYPE_CHECKING:
+    from .ml_service import InterviewAnalyzer
+    from .vapi_service import VAPIManager
+    from .resume_service import ATSResumeAnalyzer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,7 +39,8 @@ app = FastAPI(
     description="Backend API for AI-powered mock interview platform with VAPI integration",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -39,10 +52,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-analyzer = InterviewAnalyzer()
-vapi_manager = VAPIManager()
-resume_analyzer = ATSResumeAnalyzer()
+# Shared secret for the admin endpoints (unset disables them)
+ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN')
+
+# Services (and their client libraries) are imported and created on first
+# use rather than at module import or startup
+@lru_cache(maxsize=1)
+def get_analyzer() -> "InterviewAnalyzer":
+    from .ml_service import InterviewAnalyzer
+    return InterviewAnalyzer()
+
+@lru_cache(maxsize=1)
+def get_vapi_manager() -> "VAPIManager":
+    from .vapi_service import VAPIManager
+    return VAPIManager()
+
+@lru_cache(maxsize=1)
+def get_resume_analyzer() -> "ATSResumeAnalyzer":
+    from .resume_service import ATSResumeAnalyzer
+    return ATSResumeAnalyzer()
+
+# Concurrent resume analyses are coalesced into batches of up to this many
+# requests, waiting at most this long (seconds) for a batch to fill; identical
+# submissions in a batch share one LLM completion, distinct ones get their own
+RESUME_BATCH_SIZE = 8
+RESUME_BATCH_WINDOW = 0.005
+_resume_batches: set = set()
+
+# Question lists for recent interview configurations; the question bank is
+# only written by seeding, so entries stay valid until explicitly cleared
+QUESTION_CACHE_SIZE = 256
+_question_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+def clear_question_cache() -> None:
+    """
+    Drop cached question lists after the question bank changes
+    """
+    _question_cache.clear()
 
 # Pydantic models for request/response validation
 class InterviewStartRequest(BaseModel):
@@ -101,6 +147,73 @@ async def startup_event():
         logger.info("Database initialized and seeded successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
+    
+    # Resume parsing is CPU-bound, so it runs in worker processes; the
+    # semaphore bounds how many uploads are being parsed at once. Workers are
+    # started from a clean forkserver rather than forked from the running
+    # event loop and its open sockets and threads.
+    workers = os.cpu_count() or 1
+    app.state.resume_pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("forkserver")
+    )
+    app.state.resume_sem = asyncio.Semaphore(workers * 2)
+    app.state.resume_queue = asyncio.Queue()
+    app.state.resume_batcher = asyncio.create_task(_batch_resume_analyses(app.state.resume_queue))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker processes and database connections on shutdown"""
+    app.state.resume_batcher.cancel()
+    # Don't block the event loop waiting for running parses to finish
+    app.state.resume_pool.shutdown(wait=False, cancel_futures=True)
+    # Close only the services that were actually used
+    for get_service in (get_vapi_manager, get_analyzer, get_resume_analyzer):
+        if get_service.cache_info().currsize:
+            await get_service().aclose()
+    await async_engine.dispose()
+    engine.dispose()
+
+async def _batch_resume_analyses(pending: asyncio.Queue) -> None:
+    """
+    Collect queued resume analyses into batches and dispatch each batch
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        items = [await pending.get()]
+        deadline = loop.time() + RESUME_BATCH_WINDOW
+        while len(items) < RESUME_BATCH_SIZE and (left := deadline - loop.time()) > 0:
+            try:
+                items.append(await asyncio.wait_for(pending.get(), left))
+            except asyncio.TimeoutError:
+                break
+        
+        # Run the batch in the background so the next one can start filling
+        task = asyncio.create_task(_run_resume_batch(items))
+        _resume_batches.add(task)
+        task.add_done_callback(_resume_batches.discard)
+
+async def _run_resume_batch(items: List[tuple]) -> None:
+    """
+    Analyze one batch of resumes and route each result to its caller.
+    Every distinct request is sent as its own completion, so one user's
+    resume never shares a prompt with another's, and results are matched
+    to callers by request rather than by position in a model reply.
+    """
+    analyzer = get_resume_analyzer()
+    unique = list(dict.fromkeys(args for args, _ in items))
+    results = await asyncio.gather(
+        *(analyzer.analyze_resume_async(*args) for args in unique), return_exceptions=True
+    )
+    by_request = dict(zip(unique, results))
+    
+    for args, future in items:
+        if future.done():
+            continue
+        result = by_request[args]
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
 
 # Health check endpoint
 @app.get("/")
@@ -110,7 +223,7 @@ async def root():
         "status": "online",
         "message": "AI Mock Interview API",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow()
     }
 
 @app.get("/health")
@@ -120,15 +233,15 @@ async def health_check():
         "status": "healthy",
         "services": {
             "database": "connected",
-            "ml_model": "loaded" if analyzer.model else "rule_based",
-            "vapi": "configured" if vapi_manager.api_key else "not_configured"
+            "ml_model": "loaded" if get_analyzer().model else "rule_based",
+            "vapi": "configured" if get_vapi_manager().api_key else "not_configured"
         },
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow()
     }
 
 # Interview Management Endpoints
 @app.post("/api/interview/start", response_model=InterviewStartResponse)
-async def start_interview(request: InterviewStartRequest, db: Session = Depends(get_db)):
+async def start_interview(request: InterviewStartRequest, db: AsyncSession = Depends(get_db)):
     """
     Start a new interview session with VAPI integration
     """
@@ -137,7 +250,7 @@ async def start_interview(request: InterviewStartRequest, db: Session = Depends(
         session_id = str(uuid.uuid4())
         
         # Get questions based on filters
-        questions = get_questions_for_interview(
+        questions = await get_questions_for_interview(
             interview_type=request.interview_type,
             difficulty=request.difficulty,
             company=request.company,
@@ -161,10 +274,11 @@ async def start_interview(request: InterviewStartRequest, db: Session = Depends(
             status='in_progress'
         )
         db.add(session)
-        db.commit()
+        await db.commit()
         
         # Configure VAPI assistant
         question_texts = [q['question_text'] for q in questions]
+        vapi_manager = get_vapi_manager()
         vapi_config = vapi_manager.create_assistant_config(
             session_id=session_id,
             interview_type=request.interview_type,
@@ -172,7 +286,7 @@ async def start_interview(request: InterviewStartRequest, db: Session = Depends(
         )
         
         # Create VAPI assistant
-        assistant_result = vapi_manager.create_assistant(vapi_config)
+        assistant_result = await vapi_manager.create_assistant(vapi_config)
         assistant_id = assistant_result.get('id') if 'error' not in assistant_result else None
         
         return InterviewStartResponse(
@@ -187,152 +301,165 @@ async def start_interview(request: InterviewStartRequest, db: Session = Depends(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/interview/analyze-response", response_model=ResponseAnalysisResult)
-async def analyze_response(request: ResponseAnalysisRequest, db: Session = Depends(get_db)):
+async def analyze_response(request: ResponseAnalysisRequest, db: AsyncSession = Depends(get_db)):
     """
     Analyze a single interview response using ML model
     """
     try:
-        # Get question details
-        question = db.query(InterviewQuestion).filter(
-            InterviewQuestion.question_id == request.question_id
-        ).first()
-        
-        if not question:
-            raise HTTPException(status_code=404, detail="Question not found")
-        
-        # Get session details
-        session = db.query(InterviewSession).filter(
-            InterviewSession.session_id == request.session_id
-        ).first()
+        # Get question and session details in one round trip
+        row = (await db.execute(
+            select(InterviewQuestion, InterviewSession)
+            .join(InterviewSession, true())
+            .where(
+                InterviewQuestion.question_id == request.question_id,
+                InterviewSession.session_id == request.session_id
+            )
+        )).first()
         
-        if not session:
+        if row is None:
+            if not await db.get(InterviewQuestion, request.question_id):
+                raise HTTPException(status_code=404, detail="Question not found")
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Analyze response using ML model
-        analysis = analyzer.analyze_response(
+        question, session = row
+        
+        # Analyze response using the LLM
+        analysis = await get_analyzer().analyze_response_async(
             response_text=request.response_text,
             question_text=question.question_text,
             interview_type=session.interview_type
         )
         
-        # Store response in database
-        response_record = SessionResponse(
-            session_id=request.session_id,
-            question_id=request.question_id,
-            question_number=request.question_number,
-            response_text=request.response_text,
-            word_count=analysis['features'].get('word_count', 0),
-            filler_word_count=analysis['features'].get('filler_word_count', 0),
-            technical_term_count=analysis['features'].get('technical_term_count', 0),
-            average_word_length=analysis['features'].get('avg_word_length', 0),
-            content_quality_score=analysis['scores']['content_quality'],
-            communication_score=analysis['scores']['communication'],
-            confidence_score=analysis['scores']['confidence'],
-            technical_accuracy_score=analysis['scores']['technical_accuracy'],
-            overall_response_score=analysis['overall_score'],
-            response_rating=analysis['rating']
-        )
-        db.add(response_record)
-        db.commit()
-        db.refresh(response_record)
-        
-        # Generate and store feedback
-        feedback_suggestions = analyzer.generate_feedback_suggestions(analysis)
-        for feedback_item in feedback_suggestions:
-            feedback = FeedbackDetail(
+        # Store response in database; RETURNING hands back the generated id
+        # with the INSERT itself, without hydrating an ORM instance
+        response_id = (await db.execute(
+            insert(SessionResponse).values(
                 session_id=request.session_id,
-                response_id=response_record.response_id,
-                feedback_type=feedback_item['type'],
-                feedback_text=feedback_item['message']
-            )
-            db.add(feedback)
-        db.commit()
-        
-        return ResponseAnalysisResult(
-            response_id=response_record.response_id,
-            quality_score=analysis['overall_score'],
-            content_quality=analysis['scores']['content_quality'],
-            communication=analysis['scores']['communication'],
-            confidence=analysis['scores']['confidence'],
-            technical_accuracy=analysis['scores']['technical_accuracy'],
-            rating=analysis['rating'],
-            feedback=feedback_suggestions,
-            metrics=analysis['features']
-        )
+                question_id=request.question_id,
+                question_number=request.question_number,
+                response_text=request.response_text,
+                word_count=analysis['features'].get('word_count', 0),
+                filler_word_count=analysis['features'].get('filler_word_count', 0),
+                technical_term_count=analysis['features'].get('technical_term_count', 0),
+                average_word_length=analysis['features'].get('avg_word_length', 0),
+                content_quality_score=analysis['scores']['content_quality'],
+                communication_score=analysis['scores']['communication'],
+                confidence_score=analysis['scores']['confidence'],
+                technical_accuracy_score=analysis['scores']['technical_accuracy'],
+                overall_response_score=analysis['overall_score'],
+                response_rating=analysis['rating']
+            ).returning(SessionResponse.response_id)
+        )).scalar_one()
+        
+        # Generate and store feedback in one bulk INSERT, committed together with the response
+        feedback_suggestions = get_analyzer().generate_feedback_suggestions(analysis)
+        feedback_rows = [
+            {
+                'session_id': request.session_id,
+                'response_id': response_id,
+                'feedback_type': feedback_item['type'],
+                'feedback_text': feedback_item['message']
+            }
+            for feedback_item in feedback_suggestions
+        ]
+        if feedback_rows:
+            await db.execute(insert(FeedbackDetail), feedback_rows)
+        await db.commit()
+        
+        # Built from our own analysis output; skip response_model revalidation
+        return ORJSONResponse(content={
+            'response_id': response_id,
+            'quality_score': analysis['overall_score'],
+            'content_quality': analysis['scores']['content_quality'],
+            'communication': analysis['scores']['communication'],
+            'confidence': analysis['scores']['confidence'],
+            'technical_accuracy': analysis['scores']['technical_accuracy'],
+            'rating': analysis['rating'],
+            'feedback': feedback_suggestions,
+            'metrics': analysis['features']
+        })
         
     except Exception as e:
         logger.error(f"Error analyzing response: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/interview/end", response_model=FeedbackResponse)
-async def end_interview(request: EndInterviewRequest, db: Session = Depends(get_db)):
+async def end_interview(request: EndInterviewRequest, db: AsyncSession = Depends(get_db)):
     """
     End interview session and generate comprehensive feedback
     """
     try:
         # Get session
-        session = db.query(InterviewSession).filter(
-            InterviewSession.session_id == request.session_id
-        ).first()
+        session = await db.get(InterviewSession, request.session_id)
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Get all responses for this session
-        responses = db.query(SessionResponse).filter(
-            SessionResponse.session_id == request.session_id
-        ).order_by(SessionResponse.question_number).all()
+        # Calculate overall metrics
+        overall_analysis = await calculate_overall_feedback(request.session_id, db)
         
-        if not responses:
+        if overall_analysis['overall_rating'] == 'insufficient_data':
             raise HTTPException(status_code=400, detail="No responses found for this session")
         
-        # Calculate overall metrics
-        overall_analysis = calculate_overall_feedback(responses, db)
-        
         # Update session
         session.status = 'completed'
         session.completed_at = datetime.utcnow()
         session.overall_score = overall_analysis['overall_score']
         session.overall_rating = overall_analysis['overall_rating']
-        db.commit()
-        
-        # Generate detailed breakdown
-        question_breakdown = []
-        for response in responses:
-            # Get question details
-            question = db.query(InterviewQuestion).filter(
-                InterviewQuestion.question_id == response.question_id
-            ).first()
-            
-            # Get feedback for this response
-            feedback_items = db.query(FeedbackDetail).filter(
-                FeedbackDetail.response_id == response.response_id
-            ).all()
-            
-            question_breakdown.append({
-                'question_number': response.question_number,
-                'question_text': question.question_text if question else "Question not found",
-                'response_text': response.response_text,
-                'scores': {
-                    'content_quality': float(response.content_quality_score or 0),
-                    'communication': float(response.communication_score or 0),
-                    'confidence': float(response.confidence_score or 0),
-                    'technical_accuracy': float(response.technical_accuracy_score or 0),
-                    'overall': float(response.overall_response_score or 0)
-                },
-                'rating': response.response_rating,
-                'feedback': [{'type': f.feedback_type, 'message': f.feedback_text} for f in feedback_items]
-            })
-        
-        return FeedbackResponse(
-            session_id=request.session_id,
-            overall_score=overall_analysis['overall_score'],
-            overall_rating=overall_analysis['overall_rating'],
-            strengths=overall_analysis['strengths'],
-            improvements=overall_analysis['improvements'],
-            detailed_analysis=overall_analysis['detailed_metrics'],
-            question_breakdown=question_breakdown
-        )
+        await db.commit()
+        
+        # Load the breakdown (responses joined to their question text) and the
+        # feedback in two queries rather than one per response
+        responses = (await db.execute(
+            select(
+                SessionResponse.response_id,
+                SessionResponse.question_number,
+                InterviewQuestion.question_text,
+                SessionResponse.response_text,
+                SessionResponse.content_quality_score,
+                SessionResponse.communication_score,
+                SessionResponse.confidence_score,
+                SessionResponse.technical_accuracy_score,
+                SessionResponse.overall_response_score,
+                SessionResponse.response_rating
+            )
+            .outerjoin(InterviewQuestion, InterviewQuestion.question_id == SessionResponse.question_id)
+            .where(SessionResponse.session_id == request.session_id)
+            .order_by(SessionResponse.question_number)
+        )).all()
+        feedback_map = defaultdict(list)
+        for response_id, feedback_type, feedback_text in await db.execute(
+            select(FeedbackDetail.response_id, FeedbackDetail.feedback_type, FeedbackDetail.feedback_text)
+            .where(FeedbackDetail.session_id == request.session_id)
+            .order_by(FeedbackDetail.feedback_id)
+        ):
+            feedback_map[response_id].append({'type': feedback_type, 'message': feedback_text})
+        
+        return {
+            'session_id': request.session_id,
+            'overall_score': overall_analysis['overall_score'],
+            'overall_rating': overall_analysis['overall_rating'],
+            'strengths': overall_analysis['strengths'],
+            'improvements': overall_analysis['improvements'],
+            'detailed_analysis': overall_analysis['detailed_metrics'],
+            'question_breakdown': [
+                {
+                    'question_number': response.question_number,
+                    'question_text': response.question_text or "Question not found",
+                    'response_text': response.response_text,
+                    'scores': {
+                        'content_quality': float(response.content_quality_score or 0),
+                        'communication': float(response.communication_score or 0),
+                        'confidence': float(response.confidence_score or 0),
+                        'technical_accuracy': float(response.technical_accuracy_score or 0),
+                        'overall': float(response.overall_response_score or 0)
+                    },
+                    'rating': response.response_rating,
+                    'feedback': feedback_map[response.response_id]
+                }
+                for response in responses
+            ]
+        }
         
     except Exception as e:
         logger.error(f"Error ending interview: {e}")
@@ -341,38 +468,45 @@ async def end_interview(request: EndInterviewRequest, db: Session = Depends(get_
 # Question Management Endpoints
 @app.get("/api/questions/{interview_type}", response_model=QuestionResponse)
 async def get_questions(
+    request: Request,
+    response: Response,
     interview_type: str, 
     difficulty: Optional[str] = None, 
     company: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get available questions for a specific interview type
     """
     try:
-        query = db.query(InterviewQuestion).filter(
+        # Select only the returned columns so rows skip ORM hydration
+        query = select(
+            InterviewQuestion.question_id,
+            InterviewQuestion.question_text,
+            InterviewQuestion.difficulty_level.label('difficulty'),
+            InterviewQuestion.category,
+            InterviewQuestion.company,
+            InterviewQuestion.expected_keywords
+        ).where(
             InterviewQuestion.interview_type == interview_type
         )
         
         if difficulty:
-            query = query.filter(InterviewQuestion.difficulty_level == difficulty)
+            query = query.where(InterviewQuestion.difficulty_level == difficulty)
         
         if company:
-            query = query.filter(InterviewQuestion.company == company)
+            query = query.where(InterviewQuestion.company == company)
         
-        questions = query.all()
+        question_list = [dict(row) for row in (await db.execute(query)).mappings()]
         
-        question_list = [
-            {
-                'question_id': q.question_id,
-                'question_text': q.question_text,
-                'difficulty': q.difficulty_level,
-                'category': q.category,
-                'company': q.company,
-                'expected_keywords': q.expected_keywords
-            }
-            for q in questions
-        ]
+        # The validator is derived from the rows themselves, so it stays correct
+        # across restarts, workers and direct writes to the question bank; an
+        # unchanged list is answered with a 304 and no body
+        etag = f'W/"{hashlib.blake2b(orjson.dumps(question_list), digest_size=16).hexdigest()}"'
+        cache_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+        if etag_matches(request.headers.get('if-none-match'), etag):
+            return Response(status_code=304, headers=cache_headers)
+        response.headers.update(cache_headers)
         
         return QuestionResponse(
             questions=question_list,
@@ -385,34 +519,38 @@ async def get_questions(
 
 # Session Management Endpoints
 @app.get("/api/session/{session_id}")
-async def get_session_details(session_id: str, db: Session = Depends(get_db)):
+async def get_session_details(session_id: str, db: AsyncSession = Depends(get_db)):
     """
     Get details of a specific interview session
     """
     try:
-        session = db.query(InterviewSession).filter(
-            InterviewSession.session_id == session_id
-        ).first()
+        # Read plain columns plus a count subquery instead of materializing
+        # the session and every response as ORM objects just to count them
+        responses_count = select(func.count()).where(
+            SessionResponse.session_id == InterviewSession.session_id
+        ).scalar_subquery()
+        session = (await db.execute(
+            select(
+                InterviewSession.session_id,
+                InterviewSession.interview_type,
+                InterviewSession.difficulty_level,
+                InterviewSession.company,
+                InterviewSession.duration_minutes,
+                InterviewSession.status,
+                InterviewSession.started_at,
+                InterviewSession.completed_at,
+                InterviewSession.overall_score,
+                InterviewSession.overall_rating,
+                responses_count.label('responses_count')
+            ).where(InterviewSession.session_id == session_id)
+        )).mappings().first()
         
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        responses = db.query(SessionResponse).filter(
-            SessionResponse.session_id == session_id
-        ).all()
-        
         return {
-            "session_id": session.session_id,
-            "interview_type": session.interview_type,
-            "difficulty_level": session.difficulty_level,
-            "company": session.company,
-            "duration_minutes": session.duration_minutes,
-            "status": session.status,
-            "started_at": session.started_at.isoformat() if session.started_at else None,
-            "completed_at": session.completed_at.isoformat() if session.completed_at else None,
-            "overall_score": float(session.overall_score) if session.overall_score else None,
-            "overall_rating": session.overall_rating,
-            "responses_count": len(responses)
+            **session,
+            "overall_score": float(session['overall_score']) if session['overall_score'] else None
         }
         
     except Exception as e:
@@ -430,29 +568,67 @@ async def handle_vapi_webhook(request: Request):
         payload = await request.body()
         signature = request.headers.get('x-vapi-signature', '')
         
-        # Validate webhook signature
-        if not vapi_manager.validate_webhook_signature(payload.decode(), signature):
+        # Validate webhook signature over the raw bytes
+        vapi_manager = get_vapi_manager()
+        if not vapi_manager.validate_webhook_signature(payload, signature):
             raise HTTPException(status_code=401, detail="Invalid webhook signature")
         
-        # Parse JSON payload
-        webhook_data = await request.json()
+        # Parse the body already read above instead of re-reading it
+        webhook_data = orjson.loads(payload)
         
         # Handle the webhook
         result = vapi_manager.handle_webhook(webhook_data)
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error handling VAPI webhook: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Admin Endpoints
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow the request only with an X-Admin-Token header matching ADMIN_API_TOKEN;
+    admin endpoints are disabled when no token is configured
+    """
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode('utf-8'), ADMIN_API_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/api/admin/questions/cache/clear", dependencies=[Depends(require_admin_token)])
+async def clear_questions_cache():
+    """
+    Invalidate cached interview question lists. The cache lives in process
+    memory, so this only affects the worker that serves the request; with
+    several workers, restart them instead.
+    """
+    clear_question_cache()
+    return {"status": "cleared"}
+
 # Utility Functions
-def get_questions_for_interview(
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header (a comma-separated list or *)
+    against an ETag
+    """
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix('W/')
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*' or candidate.removeprefix('W/') == opaque:
+            return True
+    return False
+
+async def get_questions_for_interview(
     interview_type: str, 
     difficulty: str, 
     company: Optional[str], 
     duration: int, 
-    db: Session
+    db: AsyncSession
 ) -> List[Dict[str, Any]]:
     """
     Retrieve appropriate questions based on interview parameters
@@ -462,27 +638,37 @@ def get_questions_for_interview(
     minutes_per_question = 9 if interview_type.startswith('technical') else 7
     num_questions = max(3, min(10, duration // minutes_per_question))
     
+    cache_key = (interview_type, difficulty, company, num_questions)
+    cached = _question_cache.get(cache_key)
+    if cached is not None:
+        _question_cache.move_to_end(cache_key)
+        return [dict(q) for q in cached]
+    
     # Query questions
-    query = db.query(InterviewQuestion).filter(
+    query = select(InterviewQuestion).where(
         InterviewQuestion.interview_type == interview_type,
         InterviewQuestion.difficulty_level == difficulty
     )
     
     # Add company filter if specified
     if company:
-        company_questions = query.filter(InterviewQuestion.company == company).limit(num_questions).all()
+        company_questions = list(await db.scalars(
+            query.where(InterviewQuestion.company == company).limit(num_questions)
+        ))
         if len(company_questions) < num_questions:
             # Fill remaining with generic questions
-            generic_questions = query.filter(InterviewQuestion.company.is_(None)).limit(
-                num_questions - len(company_questions)
-            ).all()
+            generic_questions = list(await db.scalars(
+                query.where(InterviewQuestion.company.is_(None)).limit(
+                    num_questions - len(company_questions)
+                )
+            ))
             all_questions = company_questions + generic_questions
         else:
             all_questions = company_questions
     else:
-        all_questions = query.limit(num_questions).all()
+        all_questions = (await db.scalars(query.limit(num_questions))).all()
     
-    return [
+    questions = [
         {
             "question_id": q.question_id,
             "question_text": q.question_text,
@@ -493,12 +679,42 @@ def get_questions_for_interview(
         }
         for q in all_questions
     ]
+    
+    _question_cache[cache_key] = tuple(dict(q) for q in questions)
+    if len(_question_cache) > QUESTION_CACHE_SIZE:
+        _question_cache.popitem(last=False)
+    
+    return questions
+
+# Overall score thresholds (inclusive lower bounds) and the rating for each band
+_RATING_THRESHOLDS = (5.0, 7.0, 8.5)
+_RATING_LABELS = ("needs_improvement", "average", "good", "excellent")
 
-def calculate_overall_feedback(responses: List[SessionResponse], db: Session) -> Dict[str, Any]:
+async def calculate_overall_feedback(session_id: str, db: AsyncSession) -> Dict[str, Any]:
     """
-    Calculate comprehensive feedback across all responses
+    Calculate comprehensive feedback across all responses of a session
+    using a single aggregate query
     """
-    if not responses:
+    # NULL scores count as 0, matching the per-response breakdown
+    stats = (await db.execute(
+        select(
+            func.avg(func.coalesce(SessionResponse.content_quality_score, 0)),
+            func.avg(func.coalesce(SessionResponse.communication_score, 0)),
+            func.avg(func.coalesce(SessionResponse.confidence_score, 0)),
+            func.avg(func.coalesce(SessionResponse.technical_accuracy_score, 0)),
+            func.coalesce(func.sum(SessionResponse.word_count), 0),
+            func.coalesce(func.sum(SessionResponse.filler_word_count), 0),
+            func.coalesce(func.sum(SessionResponse.technical_term_count), 0),
+            func.avg(func.coalesce(SessionResponse.average_word_length, 0)),
+            func.count()
+        ).where(SessionResponse.session_id == session_id)
+    )).one()
+    
+    (avg_content, avg_communication, avg_confidence, avg_technical,
+     total_words, total_filler_words, total_tech_terms, avg_word_length,
+     responses_count) = stats
+    
+    if not responses_count:
         return {
             "overall_score": 0.0,
             "overall_rating": "insufficient_data",
@@ -507,29 +723,21 @@ def calculate_overall_feedback(responses: List[SessionResponse], db: Session) ->
             "detailed_metrics": {}
         }
     
-    # Calculate averages
-    avg_content = sum(float(r.content_quality_score or 0) for r in responses) / len(responses)
-    avg_communication = sum(float(r.communication_score or 0) for r in responses) / len(responses)
-    avg_confidence = sum(float(r.confidence_score or 0) for r in responses) / len(responses)
-    avg_technical = sum(float(r.technical_accuracy_score or 0) for r in responses) / len(responses)
+    avg_content = float(avg_content)
+    avg_communication = float(avg_communication)
+    avg_confidence = float(avg_confidence)
+    avg_technical = float(avg_technical)
     
     overall_score = (avg_content + avg_communication + avg_confidence + avg_technical) / 4
     
     # Determine overall rating
-    if overall_score >= 8.5:
-        overall_rating = "excellent"
-    elif overall_score >= 7.0:
-        overall_rating = "good"
-    elif overall_score >= 5.0:
-        overall_rating = "average"
-    else:
-        overall_rating = "needs_improvement"
+    overall_rating = _RATING_LABELS[bisect_right(_RATING_THRESHOLDS, overall_score)]
     
     # Aggregate metrics
-    total_words = sum(r.word_count or 0 for r in responses)
-    total_filler_words = sum(r.filler_word_count or 0 for r in responses)
-    total_tech_terms = sum(r.technical_term_count or 0 for r in responses)
-    avg_word_length = sum(float(r.average_word_length or 0) for r in responses) / len(responses)
+    total_words = int(total_words)
+    total_filler_words = int(total_filler_words)
+    total_tech_terms = int(total_tech_terms)
+    avg_word_length = float(avg_word_length)
     
     # Identify strengths and improvements
     strengths = []
@@ -541,7 +749,7 @@ def calculate_overall_feedback(responses: List[SessionResponse], db: Session) ->
         strengths.append("Strong technical knowledge and accurate explanations")
     if avg_confidence >= 8.0:
         strengths.append("Confident and assertive delivery throughout")
-    if total_filler_words / len(responses) <= 2:
+    if total_filler_words / responses_count <= 2:
         strengths.append("Professional speech with minimal filler words")
     if avg_content >= 8.0:
         strengths.append("Well-structured responses with good depth and examples")
@@ -552,7 +760,7 @@ def calculate_overall_feedback(responses: List[SessionResponse], db: Session) ->
         improvements.append("Deepen technical knowledge in key areas")
     if avg_confidence < 6.0:
         improvements.append("Practice to build confidence in your delivery")
-    if total_filler_words / len(responses) > 5:
+    if total_filler_words / responses_count > 5:
         improvements.append("Reduce filler words through practice and pausing")
     if avg_content < 6.0:
         improvements.append("Provide more detailed answers with specific examples")
@@ -572,7 +780,7 @@ def calculate_overall_feedback(responses: List[SessionResponse], db: Session) ->
             "total_words": total_words,
             "total_filler_words": total_filler_words,
             "total_tech_terms": total_tech_terms,
-            "responses_count": len(responses),
+            "responses_count": responses_count,
             "avg_word_length": round(avg_word_length, 2),
             "filler_word_ratio": round((total_filler_words / total_words) if total_words > 0 else 0, 4)
         }
@@ -587,6 +795,9 @@ def calculate_overall_feedback(responses: List[SessionResponse], db: Session) ->
     }
 
 # Resume Analysis Endpoints
+ALLOWED_RESUME_EXTENSIONS = frozenset({'.pdf', '.docx', '.txt'})
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+
 class ResumeAnalysisResponse(BaseModel):
     overall_score: int
     ats_score: int
@@ -615,23 +826,44 @@ async def analyze_resume(
         if not file.filename:
             raise HTTPException(status_code=400, detail="No filename provided")
         
-        allowed_extensions = ['.pdf', '.docx', '.txt']
-        file_ext = '.' + file.filename.lower().split('.')[-1]
+        file_ext = '.' + file.filename.rpartition('.')[2].lower()
         
-        if file_ext not in allowed_extensions:
+        if file_ext not in ALLOWED_RESUME_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Unsupported file format. Please upload PDF, DOCX, or TXT files."
             )
         
-        # Read file content
-        file_content = await file.read()
+        # Reject oversized uploads before parsing; the spooled upload is
+        # measured in place rather than read into memory
+        file_size = file.size
+        if file_size is None:
+            file_size = file.file.seek(0, os.SEEK_END)
+            file.file.seek(0)
+        if file_size > MAX_RESUME_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {MAX_RESUME_BYTES // (1024 * 1024)}MB."
+            )
         
-        # Extract text from file
-        try:
-            resume_text = FileParser.extract_text(file_content, file.filename)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
+        # Worker processes need picklable arguments, so pass the raw bytes
+        file_content = await file.read()
+        loop = asyncio.get_running_loop()
+        
+        # Resubmitted resumes are served from the text cache instead of being
+        # reparsed; the semaphore only covers parsing, so uploads waiting on
+        # the LLM don't hold up the process pool
+        text_key = text_cache_key(file_content, file.filename)
+        resume_text = get_cached_text(text_key)
+        if resume_text is None:
+            async with app.state.resume_sem:
+                try:
+                    resume_text = await loop.run_in_executor(
+                        app.state.resume_pool, FileParser.extract_text, file_content, file.filename
+                    )
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+            cache_text(text_key, resume_text)
         
         if not resume_text or len(resume_text.strip()) < 50:
             raise HTTPException(
@@ -639,12 +871,13 @@ async def analyze_resume(
                 detail="Unable to extract sufficient text from the file. Please ensure the file is not empty or corrupted."
             )
         
-        # Analyze the resume using the LLM service
-        analysis = resume_analyzer.analyze_resume(
-            resume_text=resume_text,
-            job_description=job_description or '',
-            target_role=target_role or ''
+        # Analyze the resume using the LLM service; concurrent uploads
+        # are batched by the background worker
+        future = loop.create_future()
+        await app.state.resume_queue.put(
+            ((resume_text, job_description or '', target_role or ''), future)
         )
+        analysis = await future
         
         return ResumeAnalysisResponse(**analysis)
         
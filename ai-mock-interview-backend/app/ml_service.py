@@ -1,14 +1,76 @@
 import os
-import json
+import copy
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
+from pydantic import BaseModel, ConfigDict, Field
 from dotenv import load_dotenv
 
+from .rate_limit import llm_throttle
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Normalized analyses kept for repeated (interview_type, question, response) inputs
+ANALYSIS_CACHE_SIZE = 1024
+
+# Concurrent LLM requests issued by a batch analysis
+BATCH_MAX_CONCURRENCY = 8
+
+# Request templates are built once; only the user prompt varies per call
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are an expert technical interviewer. Analyze the candidate's response and provide structured feedback in JSON format."
+}
+
+_ANALYSIS_PROMPT = """
+Analyze the following interview response.
+
+Context:
+- Interview Type: {type}
+- Question: {question}
+- Candidate Response: "{response}"
+
+Provide a JSON output with the following fields:
+1. overall_score (0-100 float)
+2. rating (one of: "Excellent", "Good", "Average", "Needs Improvement", "Poor")
+3. scores (object with 0-100 scores for: content_quality, communication, confidence, technical_accuracy)
+4. feedback (string, brief constructive feedback)
+5. improvements (list of strings, specific actionable tips)
+6. key_strengths (list of strings)
+
+Ensure the JSON is valid.
+"""
+
+_DEFAULT_HEADERS = {
+    "HTTP-Referer": "http://localhost:3000",
+    "X-Title": "AI Mock Interview Platform"
+}
+
+class _LLMScores(BaseModel):
+    model_config = ConfigDict(extra='allow')
+    
+    content_quality: float = 0
+    communication: float = 0
+    confidence: float = 0
+    technical_accuracy: float = 0
+
+class _LLMAnalysis(BaseModel):
+    """
+    Schema of the LLM's JSON output; missing fields take their defaults.
+    """
+    overall_score: float = 0
+    rating: Optional[str] = None
+    scores: _LLMScores = Field(default_factory=_LLMScores)
+    feedback: str = "No feedback provided."
+    improvements: List[str] = []
+    key_strengths: List[str] = []
+
 class InterviewAnalyzer:
     """
     Service class for analyzing interview responses using an LLM (via OpenRouter/OpenAI).
@@ -25,85 +87,161 @@ class InterviewAnalyzer:
         if not self.api_key:
             logger.warning("LLM_API_KEY not found. Analysis will fail.")
 
+        self._cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
         self.client = OpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
-            default_headers={
-                "HTTP-Referer": "http://localhost:3000",
-                "X-Title": "AI Mock Interview Platform"
-            }
+            default_headers=_DEFAULT_HEADERS
         )
+        self._async_client: Optional[AsyncOpenAI] = None
+    
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        Async client for use from the event loop, created on first use.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                default_headers=_DEFAULT_HEADERS
+            )
+        return self._async_client
     
     def analyze_response(self, response_text: str, question_text: str = '', interview_type: str = 'technical_software') -> Dict[str, Any]:
         """
         Analyze a single interview response using the LLM.
         """
-        if not response_text or not response_text.strip():
-            return self._get_empty_response()
+        result, key = self._lookup(response_text, question_text, interview_type)
+        if result is not None:
+            return result
 
         try:
             prompt = self._create_analysis_prompt(response_text, question_text, interview_type)
-            
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert technical interviewer. Analyze the candidate's response and provide structured feedback in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3
-            )
+            llm_throttle.wait_sync()
+            completion = self.client.chat.completions.create(**self._completion_params(prompt))
+            return self._complete(key, completion, interview_type)
 
-            result_text = completion.choices[0].message.content
-            analysis = json.loads(result_text)
-            
-            # Ensure the structure matches what the frontend expects
-            return self._normalize_response(analysis, interview_type)
+        except Exception as e:
+            logger.error(f"Error analyzing response with LLM: {e}")
+            return self._get_fallback_response()
+
+    async def analyze_response_async(self, response_text: str, question_text: str = '', interview_type: str = 'technical_software') -> Dict[str, Any]:
+        """
+        Async counterpart of analyze_response; awaits the LLM without holding a thread.
+        """
+        result, key = self._lookup(response_text, question_text, interview_type)
+        if result is not None:
+            return result
+
+        try:
+            prompt = self._create_analysis_prompt(response_text, question_text, interview_type)
+            await llm_throttle.wait()
+            completion = await self.aclient.chat.completions.create(**self._completion_params(prompt))
+            return self._complete(key, completion, interview_type)
 
         except Exception as e:
             logger.error(f"Error analyzing response with LLM: {e}")
             return self._get_fallback_response()
 
-    def _create_analysis_prompt(self, response: str, question: str, type: str) -> str:
-        return f"""
-        Analyze the following interview response.
+    async def batch_analyze_async(self, responses: List[Dict[str, Any]], max_concurrency: int = BATCH_MAX_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        Analyze several responses concurrently.
+        
+        Args:
+            responses: Dicts with response_text, question_text and interview_type
+            max_concurrency: Maximum number of LLM requests in flight
+            
+        Returns:
+            Analyses in the same order as the responses
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
         
-        Context:
-        - Interview Type: {type}
-        - Question: {question}
-        - Candidate Response: "{response}"
+        async def analyze(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.analyze_response_async(
+                    item.get('response_text', ''),
+                    item.get('question_text', ''),
+                    item.get('interview_type', 'technical_software')
+                )
+        
+        return await asyncio.gather(*(analyze(item) for item in responses))
 
-        Provide a JSON output with the following fields:
-        1. overall_score (0-100 float)
-        2. rating (one of: "Excellent", "Good", "Average", "Needs Improvement", "Poor")
-        3. scores (object with 0-100 scores for: content_quality, communication, confidence, technical_accuracy)
-        4. feedback (string, brief constructive feedback)
-        5. improvements (list of strings, specific actionable tips)
-        6. key_strengths (list of strings)
+    async def aclose(self) -> None:
+        """
+        Close the async client (called on application shutdown) so a later
+        event loop gets a fresh connection pool
+        """
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
 
-        Ensure the JSON is valid.
+    def _completion_params(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3
+        }
+
+    def _lookup(self, response_text: str, question_text: str, interview_type: str) -> Tuple[Optional[Dict[str, Any]], bytes]:
+        """
+        Resolve empty input or a cached analysis without an API call.
+        Re-analyzing the same answer (retries, replays) hits the cache.
+        Returns (result, cache key); result is None when the LLM must be asked.
         """
+        if not response_text or not response_text.strip():
+            return self._get_empty_response(), b''
+        key = self._cache_key(response_text, question_text, interview_type)
+        return self._cache_get(key), key
 
-    def _normalize_response(self, data: Dict[str, Any], interview_type: str) -> Dict[str, Any]:
+    def _complete(self, key: bytes, completion: Any, interview_type: str) -> Dict[str, Any]:
+        """
+        Parse and validate a completion in one pass in pydantic-core, shape it
+        for the frontend and cache the result under key.
+        """
+        analysis = _LLMAnalysis.model_validate_json(completion.choices[0].message.content)
+        result = self._normalize_response(analysis, interview_type)
+        self._cache_put(key, result)
+        return result
+
+    @staticmethod
+    def _cache_key(response_text: str, question_text: str, interview_type: str) -> bytes:
+        return hashlib.blake2b(
+            f"{interview_type}\0{question_text}\0{response_text}".encode('utf-8'), digest_size=16
+        ).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return copy.deepcopy(self._cache[key])
+        return None
+
+    def _cache_put(self, key: bytes, result: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._cache[key] = copy.deepcopy(result)
+            if len(self._cache) > ANALYSIS_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _create_analysis_prompt(self, response: str, question: str, type: str) -> str:
+        return _ANALYSIS_PROMPT.format_map({'type': type, 'question': question, 'response': response})
+
+    def _normalize_response(self, data: _LLMAnalysis, interview_type: str) -> Dict[str, Any]:
         """
         Ensure the LLM response has all required fields for the frontend.
         """
-        default_scores = {
-            "content_quality": 0,
-            "communication": 0,
-            "confidence": 0,
-            "technical_accuracy": 0
-        }
-        
         return {
-            "overall_score": data.get("overall_score", 0),
-            "rating": data.get("rating", "Needs Improvement"),
-            "scores": {**default_scores, **data.get("scores", {})},
-            "feedback": data.get("feedback", "No feedback provided."),
-            "improvements": data.get("improvements", []),
-            "key_strengths": data.get("key_strengths", []),
+            "overall_score": data.overall_score,
+            "rating": data.rating or "Needs Improvement",
+            "scores": data.scores.model_dump(),
+            "feedback": data.feedback,
+            "improvements": data.improvements,
+            "key_strengths": data.key_strengths,
             "interview_type": interview_type,
-            "ml_prediction": {"confidence": 1.0, "prediction": data.get("rating", "Average")} # Mock for backward compatibility
+            "ml_prediction": {"confidence": 1.0, "prediction": data.rating or "Average"} # Mock for backward compatibility
         }
 
     def _get_empty_response(self) -> Dict[str, Any]:
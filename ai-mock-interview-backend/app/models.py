@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, TIMESTAMP, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DECIMAL, TIMESTAMP, Boolean, JSON, Index
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -42,8 +43,14 @@ class InterviewQuestion(Base):
     difficulty_level = Column(String(20), nullable=False)
     company = Column(String(100), nullable=True)
     category = Column(String(50), nullable=True)
-    expected_keywords = Column(JSON, nullable=True)  # Store as JSON for SQLite compatibility
+    expected_keywords = Column(JSON().with_variant(ARRAY(Text), 'postgresql'), nullable=True)  # text[] on Postgres, JSON on SQLite
     created_at = Column(TIMESTAMP, server_default=func.now())
+    
+    # GIN index turns keyword overlap (&&) / containment (@>) into index scans on Postgres
+    __table_args__ = (
+        Index('ix_interview_questions_expected_keywords', 'expected_keywords', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('ix_interview_questions_type_difficulty', 'interview_type', 'difficulty_level'),
+    )
 
 class SessionResponse(Base):
     """User responses to interview questions"""
@@ -71,6 +78,11 @@ class SessionResponse(Base):
     technical_accuracy_score = Column(DECIMAL(4, 2), nullable=True)
     overall_response_score = Column(DECIMAL(4, 2), nullable=True)
     response_rating = Column(String(20), nullable=True)
+    
+    # Per-session aggregates and the ordered breakdown read by session_id
+    __table_args__ = (
+        Index('ix_session_responses_session_question', 'session_id', 'question_number'),
+    )
 
 class FeedbackDetail(Base):
     """Detailed feedback for responses"""
@@ -82,6 +94,10 @@ class FeedbackDetail(Base):
     feedback_type = Column(String(50), nullable=False)
     feedback_text = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    
+    __table_args__ = (
+        Index('ix_feedback_details_session_feedback', 'session_id', 'feedback_id'),
+    )
 
 class MLTrainingData(Base):
     """Store data for continuous ML model improvement"""
@@ -91,6 +107,12 @@ class MLTrainingData(Base):
     question_text = Column(Text, nullable=False)
     response_text = Column(Text, nullable=False)
     manual_label = Column(String(20), nullable=True)
-    features = Column(JSON, nullable=True)
+    features = Column(JSON().with_variant(JSONB, 'postgresql'), nullable=True)  # jsonb on Postgres, JSON on SQLite
     created_at = Column(TIMESTAMP, server_default=func.now())
-    is_validated = Column(Boolean, default=False)
\ No newline at end of file
+    is_validated = Column(Boolean, default=False)
+    
+    # jsonb_path_ops GIN index serves containment (@>) filters on feature values
+    __table_args__ = (
+        Index('ix_ml_training_data_features', 'features', postgresql_using='gin',
+              postgresql_ops={'features': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+    )
\ No newline at end of file
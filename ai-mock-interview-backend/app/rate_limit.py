@@ -0,0 +1,57 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class RequestThrottle:
+    """
+    Sliding-window cap on requests started per minute (0 disables it).
+    Each caller reserves the earliest free slot and then sleeps until it,
+    so requests are released in arrival order. The throttle holds no
+    asyncio primitives and is safe to share across event loops and threads.
+    """
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._started: deque = deque()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Claim the next request slot and return the seconds to wait for it
+        """
+        with self._lock:
+            now = time.monotonic()
+            while self._started and self._started[0] <= now - 60:
+                self._started.popleft()
+            if len(self._started) < self.per_minute:
+                start_at = now
+            else:
+                start_at = self._started[-self.per_minute] + 60
+            self._started.append(start_at)
+        return start_at - now
+
+    async def wait(self) -> None:
+        if self.per_minute <= 0:
+            return
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_sync(self) -> None:
+        if self.per_minute <= 0:
+            return
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+# One budget per process for every completion sent to the LLM provider. The
+# default matches OpenRouter's per-minute limit for free models.
+llm_throttle = RequestThrottle(int(os.getenv("LLM_REQUESTS_PER_MINUTE", "20")))
+
+# VAPI API calls (assistant creation, call start and lookup)
+vapi_throttle = RequestThrottle(int(os.getenv("VAPI_REQUESTS_PER_MINUTE", "0")))
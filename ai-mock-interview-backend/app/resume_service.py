@@ -1,61 +1,31 @@
 import os
-import json
+import copy
+import asyncio
+import time
+import hashlib
 import logging
-from typing import Dict, Any, List
-from openai import OpenAI
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
+import orjson
+
+from .rate_limit import llm_throttle
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-class ATSResumeAnalyzer:
-    """
-    Service class for analyzing resumes using an LLM with ATS optimization focus.
-    """
-    
-    def __init__(self):
-        """
-        Initialize the LLM client for resume analysis.
-        """
-        self.api_key = os.getenv("LLM_API_KEY")
-        self.base_url = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
-        self.model = os.getenv("LLM_MODEL", "google/gemini-2.0-flash-exp:free")
+# Normalized analyses kept for repeated (resume, job description, role) inputs
+RESUME_CACHE_SIZE = 1024
+RESUME_CACHE_TTL = 3600  # seconds
 
-        if not self.api_key:
-            logger.warning("LLM_API_KEY not found. Resume analysis will fail.")
+# Resumes packed into one completion by analyze_resumes_batch (single-tenant bulk scoring only)
+MAX_RESUMES_PER_CALL = 5
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-            default_headers={
-                "HTTP-Referer": "http://localhost:3000",
-                "X-Title": "AI Mock Interview Platform"
-            }
-        )
-    
-    def analyze_resume(self, resume_text: str, job_description: str = '', target_role: str = '') -> Dict[str, Any]:
-        """
-        Analyze a resume for ATS compatibility and provide actionable feedback.
-        
-        Args:
-            resume_text: The full text of the resume
-            job_description: Optional job description to match against
-            target_role: Optional target role (e.g., "Software Engineer", "Data Scientist")
-        
-        Returns:
-            Dictionary with ATS score, feedback, and improvement suggestions
-        """
-        if not resume_text or not resume_text.strip():
-            return self._get_empty_response()
-
-        try:
-            prompt = self._create_resume_analysis_prompt(resume_text, job_description, target_role)
-            
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": '''
+# Request templates are built once; only the user prompt varies per call
+_ATS_SYSTEM_PROMPT = '''
 YOU ARE A SENIOR ATS RESUME ANALYSIS AGENT USED BY ENTERPRISE RECRUITING SYSTEMS AND EXECUTIVE SEARCH FIRMS.
 YOUR SOLE RESPONSIBILITY IS TO ANALYZE RAW RESUME TEXT AND SCORE IT BASED ON AUTHORITATIVE ATS PARSING AND RECRUITER TRUST SIGNALS.
 
@@ -262,23 +232,226 @@ You MUST output valid JSON only in the following schema:
   },
   "actionable_recommendations": []
 }
-'''},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.2  # Lower temperature for more consistent analysis
+'''
+
+_SYSTEM_MESSAGE = {"role": "system", "content": _ATS_SYSTEM_PROMPT}
+
+_DEFAULT_HEADERS = {
+    "HTTP-Referer": "http://localhost:3000",
+    "X-Title": "AI Mock Interview Platform"
+}
+
+class ATSResumeAnalyzer:
+    """
+    Service class for analyzing resumes using an LLM with ATS optimization focus.
+    """
+    
+    def __init__(self):
+        """
+        Initialize the LLM client for resume analysis.
+        """
+        self.api_key = os.getenv("LLM_API_KEY")
+        self.base_url = os.getenv("LLM_BASE_URL", "https://openrouter.ai/api/v1")
+        self.model = os.getenv("LLM_MODEL", "google/gemini-2.0-flash-exp:free")
+
+        if not self.api_key:
+            logger.warning("LLM_API_KEY not found. Resume analysis will fail.")
+
+        self._cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self.client = OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            default_headers=_DEFAULT_HEADERS
+        )
+        self._async_client: Optional[AsyncOpenAI] = None
+    
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """
+        Async client for use from the event loop, created on first use.
+        """
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                default_headers=_DEFAULT_HEADERS
             )
+        return self._async_client
+    
+    def analyze_resume(self, resume_text: str, job_description: str = '', target_role: str = '') -> Dict[str, Any]:
+        """
+        Analyze a resume for ATS compatibility and provide actionable feedback.
+        
+        Args:
+            resume_text: The full text of the resume
+            job_description: Optional job description to match against
+            target_role: Optional target role (e.g., "Software Engineer", "Data Scientist")
+        
+        Returns:
+            Dictionary with ATS score, feedback, and improvement suggestions
+        """
+        result, key = self._lookup(resume_text, job_description, target_role)
+        if result is not None:
+            return result
 
-            result_text = completion.choices[0].message.content
-            analysis = json.loads(result_text)
-            
-            # Ensure the structure is correct
-            return self._normalize_response(analysis)
+        try:
+            prompt = self._create_resume_analysis_prompt(resume_text, job_description, target_role)
+            llm_throttle.wait_sync()
+            completion = self.client.chat.completions.create(**self._completion_params(prompt))
+            return self._complete(key, completion)
 
         except Exception as e:
             logger.error(f"Error analyzing resume with LLM: {e}")
             return self._get_fallback_response()
 
+    async def analyze_resumes_batch(self, resumes: List[Tuple[str, str, str]], max_batch: int = MAX_RESUMES_PER_CALL) -> List[Dict[str, Any]]:
+        """
+        Analyze several resumes with up to max_batch of them per LLM call.
+        
+        Only for offline or bulk scoring where every resume belongs to the
+        same caller: resumes in a group share one prompt, so never mix
+        different users' submissions here. Request handlers use
+        analyze_resume_async, one completion per resume.
+        
+        The system prompt is sent once per group instead of once per resume.
+        Identical submissions are analyzed once. Each result must carry the
+        resume_number of its section; any resume without exactly one valid,
+        numbered result is retried with its own call.
+        
+        Args:
+            resumes: (resume_text, job_description, target_role) tuples
+            max_batch: Maximum number of resumes per completion
+        
+        Returns:
+            Analysis results in the same order as the resumes
+        """
+        unique = list(dict.fromkeys(resumes))
+        results: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        pending = []
+        for request in unique:
+            result, key = self._lookup(*request)
+            if result is not None:
+                results[request] = result
+            else:
+                pending.append((request, key))
+
+        groups = [pending[start:start + max_batch] for start in range(0, len(pending), max_batch)]
+        for group_results in await asyncio.gather(*(self._analyze_group(group) for group in groups)):
+            results.update(group_results)
+        return [results[request] for request in resumes]
+
+    async def _analyze_group(self, group: List[Tuple[Tuple[str, str, str], bytes]]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """
+        Analyze one group of uncached resumes in a single completion,
+        falling back to individual calls for entries that fail.
+        """
+        numbered: Dict[int, Any] = {}
+        if len(group) > 1:
+            try:
+                prompt = self._create_batch_analysis_prompt([request for request, _ in group])
+                await llm_throttle.wait()
+                completion = await self.aclient.chat.completions.create(**self._completion_params(prompt))
+                analyses = orjson.loads(completion.choices[0].message.content).get("results", [])
+                # Route by the echoed section number, never by list position;
+                # a missing or repeated number sends the whole group to retry
+                numbered = {analysis.get("resume_number"): analysis for analysis in analyses}
+                if len(numbered) != len(analyses) or set(numbered) != set(range(1, len(group) + 1)):
+                    numbered = {}
+            except Exception as e:
+                logger.error(f"Error analyzing resume batch with LLM: {e}")
+                numbered = {}
+
+        results = {}
+        retry = []
+        for number, (request, key) in enumerate(group, 1):
+            try:
+                results[request] = self._normalize_response(numbered[number])
+                self._cache_put(key, results[request])
+            except Exception:
+                retry.append(request)
+
+        for request, result in zip(retry, await asyncio.gather(*(self.analyze_resume_async(*request) for request in retry))):
+            results[request] = result
+        return results
+
+    async def analyze_resume_async(self, resume_text: str, job_description: str = '', target_role: str = '') -> Dict[str, Any]:
+        """
+        Async counterpart of analyze_resume; awaits the LLM without holding a thread.
+        """
+        result, key = self._lookup(resume_text, job_description, target_role)
+        if result is not None:
+            return result
+
+        try:
+            prompt = self._create_resume_analysis_prompt(resume_text, job_description, target_role)
+            await llm_throttle.wait()
+            completion = await self.aclient.chat.completions.create(**self._completion_params(prompt))
+            return self._complete(key, completion)
+
+        except Exception as e:
+            logger.error(f"Error analyzing resume with LLM: {e}")
+            return self._get_fallback_response()
+
+    async def aclose(self) -> None:
+        """
+        Close the async client (called on application shutdown) so a later
+        event loop gets a fresh connection pool
+        """
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def _completion_params(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.2  # Lower temperature for more consistent analysis
+        }
+
+    def _lookup(self, resume_text: str, job_description: str, target_role: str) -> Tuple[Optional[Dict[str, Any]], bytes]:
+        """
+        Resolve empty input or a cached analysis without an API call.
+        Returns (result, cache key); result is None when the LLM must be asked.
+        """
+        if not resume_text or not resume_text.strip():
+            return self._get_empty_response(), b''
+        key = self._cache_key(resume_text, job_description, target_role)
+        return self._cache_get(key), key
+
+    def _complete(self, key: bytes, completion: Any) -> Dict[str, Any]:
+        """
+        Parse and normalize a completion, then cache the result under key.
+        """
+        result = self._normalize_response(orjson.loads(completion.choices[0].message.content))
+        self._cache_put(key, result)
+        return result
+
+    def _cache_key(self, resume_text: str, job_description: str, target_role: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self.model}\0{target_role}\0{job_description}\0{resume_text}".encode('utf-8'), digest_size=16
+        ).digest()
+
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > time.monotonic():
+                    self._cache.move_to_end(key)
+                    return copy.deepcopy(result)
+                del self._cache[key]
+        return None
+
+    def _cache_put(self, key: bytes, result: Dict[str, Any]) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + RESUME_CACHE_TTL, copy.deepcopy(result))
+            self._cache.move_to_end(key)
+            if len(self._cache) > RESUME_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
     def _create_resume_analysis_prompt(self, resume: str, job_desc: str, role: str) -> str:
         context_parts = []
         if role:
@@ -294,6 +467,26 @@ resume_text: {resume}
 {context}
 
 Follow the ATS SCORING PARAMETERS defined in the system prompt and output valid JSON matching the required schema EXACTLY.
+"""
+
+    def _create_batch_analysis_prompt(self, resumes: List[Tuple[str, str, str]]) -> str:
+        sections = []
+        for number, (resume, job_desc, role) in enumerate(resumes, 1):
+            parts = [f"---#{number}---", f"resume_text: {resume}"]
+            if role:
+                parts.append(f"target_role: {role}")
+            if job_desc:
+                parts.append(f"job_description: {job_desc[:500]}")
+            sections.append("\n".join(parts))
+        
+        resumes_block = "\n".join(sections)
+        
+        return f"""
+RESUMES:
+{resumes_block}
+
+Each resume above is independent. Analyze each one separately following the ATS SCORING PARAMETERS defined in the system prompt.
+Output valid JSON of the form {{"results": [...]}} where "results" holds exactly {len(resumes)} objects, one per resume, each matching the required schema EXACTLY plus a "resume_number" field set to the number of the section (---#N---) it analyzes.
 """
 
     def _normalize_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,117 +1,101 @@
 import os
-from typing import Dict, List, Any, Optional
-import requests
+import copy
+import hmac
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+import httpx
 from dotenv import load_dotenv
-import json
+import orjson
 import logging
 
+from .rate_limit import vapi_throttle
+
 load_dotenv()
 
-class VAPIManager:
-    """
-    Manager class for VAPI voice assistant integration
-    """
-    
-    def __init__(self):
-        # Use private key for backend operations
-        self.private_key = os.getenv('VAPI_PRIVATE_KEY')
-        self.public_key = os.getenv('VAPI_PUBLIC_KEY')
-        self.assistant_id = os.getenv('VAPI_ASSISTANT_ID')
-        # Fallback to legacy key for backward compatibility
-        self.api_key = self.private_key or os.getenv('VAPI_API_KEY')
-        self.webhook_secret = os.getenv('VAPI_WEBHOOK_SECRET')
-        self.backend_url = os.getenv('BACKEND_URL', 'http://localhost:8000')
-        self.base_url = "https://api.vapi.ai"
-        
-        if not self.api_key:
-            logging.warning("VAPI_PRIVATE_KEY not found in environment variables")
-        
-        self.headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-    
-    def create_assistant_config(self, session_id: str, interview_type: str, questions: List[str]) -> Dict[str, Any]:
-        """
-        Create VAPI assistant configuration for interview session
-        """
-        
-        # Generate system prompt based on interview type
-        system_prompt = self._generate_system_prompt(interview_type, questions)
-        first_message = self._get_first_message(interview_type)
-        
-        config = {
-            "model": {
-                "provider": "openai",
-                "model": "gpt-3.5-turbo",
-                "temperature": 0.7,
-                "systemMessage": system_prompt
-            },
-            "voice": {
-                "provider": "11labs",
-                "voiceId": "21m00Tcm4TlvDq8ikWAM",  # Professional female voice
-                "stability": 0.5,
-                "similarityBoost": 0.8
-            },
-            "firstMessage": first_message,
-            "transcriber": {
-                "provider": "deepgram",
-                "model": "nova-2",
-                "language": "en-US"
-            },
-            "serverUrl": f"{self.backend_url}/api/vapi/webhook",
-            "serverUrlSecret": self.webhook_secret,
-            "recordingEnabled": True,
-            "endCallMessage": "Thank you for completing the mock interview. Your responses have been analyzed and feedback will be available shortly.",
-            "maxDurationSeconds": 3600,  # 1 hour max
-            "silenceTimeoutSeconds": 30,
-            "functions": [
-                {
-                    "name": "analyze_response",
-                    "description": "Analyze the candidate's response to a question",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "session_id": {
-                                "type": "string",
-                                "description": "The interview session ID"
-                            },
-                            "question_number": {
-                                "type": "integer",
-                                "description": "The current question number"
-                            },
-                            "response_text": {
-                                "type": "string",
-                                "description": "The candidate's response text"
-                            }
-                        },
-                        "required": ["session_id", "question_number", "response_text"]
+# Seconds allowed for each VAPI API request
+VAPI_TIMEOUT = 10.0
+
+_FIRST_MESSAGES = {
+    'technical_software': "Hello! Welcome to your technical software engineering mock interview. I'll be asking you several questions to assess your technical knowledge and problem-solving skills. Please answer as thoroughly as you can, and feel free to think out loud. Are you ready to begin?",
+    'behavioral': "Hello! Welcome to your behavioral mock interview. I'll be asking you questions about your past experiences and how you handle various workplace situations. Please provide specific examples and details about your role and the outcomes. Are you ready to start?",
+    'system_design': "Hello! Welcome to your system design mock interview. I'll be presenting you with design challenges where you should think about scalability, trade-offs, and system architecture. Please explain your thought process as you work through each problem. Ready to begin?",
+    'general': "Hello! Welcome to your mock interview. I'll be asking you a series of questions to assess your skills and experience. Please answer thoughtfully and provide specific examples where possible. Are you ready to get started?"
+}
+
+# Static assistant settings; the None fields are filled per session
+_ASSISTANT_TEMPLATE = {
+    "model": {
+        "provider": "openai",
+        "model": "gpt-3.5-turbo",
+        "temperature": 0.7,
+        "systemMessage": None
+    },
+    "voice": {
+        "provider": "11labs",
+        "voiceId": "21m00Tcm4TlvDq8ikWAM",  # Professional female voice
+        "stability": 0.5,
+        "similarityBoost": 0.8
+    },
+    "firstMessage": None,
+    "transcriber": {
+        "provider": "deepgram",
+        "model": "nova-2",
+        "language": "en-US"
+    },
+    "serverUrl": None,
+    "serverUrlSecret": None,
+    "recordingEnabled": True,
+    "endCallMessage": "Thank you for completing the mock interview. Your responses have been analyzed and feedback will be available shortly.",
+    "maxDurationSeconds": 3600,  # 1 hour max
+    "silenceTimeoutSeconds": 30,
+    "functions": [
+        {
+            "name": "analyze_response",
+            "description": "Analyze the candidate's response to a question",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "session_id": {
+                        "type": "string",
+                        "description": "The interview session ID"
+                    },
+                    "question_number": {
+                        "type": "integer",
+                        "description": "The current question number"
+                    },
+                    "response_text": {
+                        "type": "string",
+                        "description": "The candidate's response text"
                     }
                 },
-                {
-                    "name": "end_interview",
-                    "description": "End the interview session",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "session_id": {
-                                "type": "string",
-                                "description": "The interview session ID"
-                            }
-                        },
-                        "required": ["session_id"]
+                "required": ["session_id", "question_number", "response_text"]
+            }
+        },
+        {
+            "name": "end_interview",
+            "description": "End the interview session",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "session_id": {
+                        "type": "string",
+                        "description": "The interview session ID"
                     }
-                }
-            ]
+                },
+                "required": ["session_id"]
+            }
         }
-        
-        return config
-    
-    def _generate_system_prompt(self, interview_type: str, questions: List[str]) -> str:
-        """
-        Generate system prompt based on interview type and questions
-        """
-        base_prompt = f"""You are a professional interviewer conducting a {interview_type.replace('_', ' ')} mock interview. Your role is to create a supportive yet professional interview environment.
+    ]
+}
+
+@lru_cache(maxsize=512)
+def _generate_system_prompt(interview_type: str, questions: Tuple[str, ...]) -> str:
+    """
+    Generate system prompt based on interview type and questions; memoized
+    since sessions reuse a small set of (type, questions) combinations
+    """
+    base_prompt = f"""You are a professional interviewer conducting a {interview_type.replace('_', ' ')} mock interview. Your role is to create a supportive yet professional interview environment.
 
 INSTRUCTIONS:
 1. Ask questions one at a time from the provided list in order
@@ -135,53 +119,116 @@ CONVERSATION FLOW:
 
 TONE: Professional, encouraging, and supportive. Make the candidate feel comfortable while maintaining interview standards."""
 
-        # Add specific guidance based on interview type
-        if 'technical' in interview_type:
-            base_prompt += """
+    # Add specific guidance based on interview type
+    if 'technical' in interview_type:
+        base_prompt += """
 
 TECHNICAL INTERVIEW GUIDANCE:
 - Listen for technical terminology, algorithms, and system design concepts
 - If a candidate mentions code, ask them to explain their thinking process
 - For system design questions, encourage them to think about scalability and trade-offs
 - Don't correct technical mistakes during the interview"""
-        
-        elif 'behavioral' in interview_type:
-            base_prompt += """
+    
+    elif 'behavioral' in interview_type:
+        base_prompt += """
 
 BEHAVIORAL INTERVIEW GUIDANCE:
 - Listen for specific examples following the STAR method (Situation, Task, Action, Result)
 - If answers are too vague, ask for more specific details about their role and actions
 - Encourage quantifiable results where applicable
 - Look for leadership, problem-solving, and teamwork examples"""
+    
+    return base_prompt
+
+class VAPIManager:
+    """
+    Manager class for VAPI voice assistant integration
+    """
+    
+    def __init__(self):
+        # Use private key for backend operations
+        self.private_key = os.getenv('VAPI_PRIVATE_KEY')
+        self.public_key = os.getenv('VAPI_PUBLIC_KEY')
+        self.assistant_id = os.getenv('VAPI_ASSISTANT_ID')
+        # Fallback to legacy key for backward compatibility
+        self.api_key = self.private_key or os.getenv('VAPI_API_KEY')
+        self.webhook_secret = os.getenv('VAPI_WEBHOOK_SECRET')
+        self._webhook_key = self.webhook_secret.encode('utf-8') if self.webhook_secret else None
+        self.backend_url = os.getenv('BACKEND_URL', 'http://localhost:8000')
+        self.base_url = "https://api.vapi.ai"
+        
+        if not self.api_key:
+            logging.warning("VAPI_PRIVATE_KEY not found in environment variables")
         
-        return base_prompt
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        self._http: Optional[httpx.AsyncClient] = None
+        
+        # Webhook event types and assistant function names mapped to handlers
+        self._webhook_handlers = {
+            'transcript': self._handle_transcript,
+            'function-call': self._handle_function_call,
+            'call-start': self._handle_call_start,
+            'call-end': self._handle_call_end
+        }
+        self._function_handlers = {
+            'analyze_response': self._function_analyze_response,
+            'end_interview': self._function_end_interview
+        }
     
-    def _get_first_message(self, interview_type: str) -> str:
+    @property
+    def http(self) -> httpx.AsyncClient:
         """
-        Generate appropriate first message based on interview type
+        Pooled HTTP client for the VAPI API, created on first use so
+        connections are kept alive across calls.
         """
-        messages = {
-            'technical_software': "Hello! Welcome to your technical software engineering mock interview. I'll be asking you several questions to assess your technical knowledge and problem-solving skills. Please answer as thoroughly as you can, and feel free to think out loud. Are you ready to begin?",
-            'behavioral': "Hello! Welcome to your behavioral mock interview. I'll be asking you questions about your past experiences and how you handle various workplace situations. Please provide specific examples and details about your role and the outcomes. Are you ready to start?",
-            'system_design': "Hello! Welcome to your system design mock interview. I'll be presenting you with design challenges where you should think about scalability, trade-offs, and system architecture. Please explain your thought process as you work through each problem. Ready to begin?",
-            'general': "Hello! Welcome to your mock interview. I'll be asking you a series of questions to assess your skills and experience. Please answer thoughtfully and provide specific examples where possible. Are you ready to get started?"
-        }
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=VAPI_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=32)
+            )
+        return self._http
+    
+    async def aclose(self) -> None:
+        """
+        Close pooled connections (called on application shutdown)
+        """
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def create_assistant_config(self, session_id: str, interview_type: str, questions: List[str]) -> Dict[str, Any]:
+        """
+        Create VAPI assistant configuration for interview session
+        """
+        
+        # Generate system prompt based on interview type
+        system_prompt = _generate_system_prompt(interview_type, tuple(questions))
+        first_message = _FIRST_MESSAGES.get(interview_type, _FIRST_MESSAGES['general'])
+        
+        # Each session gets its own copy so callers can't mutate the template
+        config = copy.deepcopy(_ASSISTANT_TEMPLATE)
+        config["model"]["systemMessage"] = system_prompt
+        config["firstMessage"] = first_message
+        config["serverUrl"] = f"{self.backend_url}/api/vapi/webhook"
+        config["serverUrlSecret"] = self.webhook_secret
         
-        return messages.get(interview_type, messages['general'])
+        return config
     
-    def create_assistant(self, config: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_assistant(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new VAPI assistant with the given configuration
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/assistant",
-                headers=self.headers,
-                json=config
-            )
+            await vapi_throttle.wait()
+            response = await self.http.post("/assistant", content=orjson.dumps(config))
             
             if response.status_code == 201:
-                return response.json()
+                return orjson.loads(response.content)
             else:
                 logging.error(f"Failed to create assistant: {response.status_code} - {response.text}")
                 return {'error': f'Failed to create assistant: {response.text}'}
@@ -190,7 +237,7 @@ BEHAVIORAL INTERVIEW GUIDANCE:
             logging.error(f"Error creating assistant: {e}")
             return {'error': str(e)}
     
-    def start_call(self, assistant_id: str, phone_number: Optional[str] = None) -> Dict[str, Any]:
+    async def start_call(self, assistant_id: str, phone_number: Optional[str] = None) -> Dict[str, Any]:
         """
         Start a phone call with the assistant
         """
@@ -204,14 +251,11 @@ BEHAVIORAL INTERVIEW GUIDANCE:
                     "number": phone_number
                 }
             
-            response = requests.post(
-                f"{self.base_url}/call",
-                headers=self.headers,
-                json=call_data
-            )
+            await vapi_throttle.wait()
+            response = await self.http.post("/call", content=orjson.dumps(call_data))
             
             if response.status_code == 201:
-                return response.json()
+                return orjson.loads(response.content)
             else:
                 logging.error(f"Failed to start call: {response.status_code} - {response.text}")
                 return {'error': f'Failed to start call: {response.text}'}
@@ -227,17 +271,12 @@ BEHAVIORAL INTERVIEW GUIDANCE:
         try:
             message_type = webhook_data.get('type', 'unknown')
             
-            if message_type == 'transcript':
-                return self._handle_transcript(webhook_data)
-            elif message_type == 'function-call':
-                return self._handle_function_call(webhook_data)
-            elif message_type == 'call-start':
-                return self._handle_call_start(webhook_data)
-            elif message_type == 'call-end':
-                return self._handle_call_end(webhook_data)
-            else:
-                logging.info(f"Received webhook type: {message_type}")
-                return {'status': 'received', 'type': message_type}
+            handler = self._webhook_handlers.get(message_type)
+            if handler is not None:
+                return handler(webhook_data)
+            
+            logging.info(f"Received webhook type: {message_type}")
+            return {'status': 'received', 'type': message_type}
                 
         except Exception as e:
             logging.error(f"Error handling webhook: {e}")
@@ -293,41 +332,46 @@ BEHAVIORAL INTERVIEW GUIDANCE:
         
         logging.info(f"Function called: {function_name} with params: {parameters}")
         
-        if function_name == 'analyze_response':
-            # The actual analysis will be handled by the main API
-            # This is just acknowledging the function call
-            return {
-                'result': {
-                    'status': 'response_queued_for_analysis',
-                    'session_id': parameters.get('session_id'),
-                    'question_number': parameters.get('question_number')
-                }
-            }
-        
-        elif function_name == 'end_interview':
-            # Signal that the interview should be ended
-            return {
-                'result': {
-                    'status': 'interview_ending',
-                    'session_id': parameters.get('session_id'),
-                    'message': 'Interview completed successfully'
-                }
-            }
+        handler = self._function_handlers.get(function_name)
+        if handler is not None:
+            return handler(parameters)
         
         return {'result': {'status': 'function_processed', 'function': function_name}}
     
-    def get_call_details(self, call_id: str) -> Dict[str, Any]:
+    def _function_analyze_response(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Acknowledge an analyze_response call; the actual analysis is handled by the main API
+        """
+        return {
+            'result': {
+                'status': 'response_queued_for_analysis',
+                'session_id': parameters.get('session_id'),
+                'question_number': parameters.get('question_number')
+            }
+        }
+    
+    def _function_end_interview(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Signal that the interview should be ended
+        """
+        return {
+            'result': {
+                'status': 'interview_ending',
+                'session_id': parameters.get('session_id'),
+                'message': 'Interview completed successfully'
+            }
+        }
+    
+    async def get_call_details(self, call_id: str) -> Dict[str, Any]:
         """
         Get details about a specific call
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/call/{call_id}",
-                headers=self.headers
-            )
+            await vapi_throttle.wait()
+            response = await self.http.get(f"/call/{call_id}")
             
             if response.status_code == 200:
-                return response.json()
+                return orjson.loads(response.content)
             else:
                 logging.error(f"Failed to get call details: {response.status_code}")
                 return {'error': 'Failed to get call details'}
@@ -336,7 +380,7 @@ BEHAVIORAL INTERVIEW GUIDANCE:
             logging.error(f"Error getting call details: {e}")
             return {'error': str(e)}
     
-    def validate_webhook_signature(self, payload: str, signature: str) -> bool:
+    def validate_webhook_signature(self, payload: bytes, signature: str) -> bool:
         """
         Validate webhook signature for security
         """
@@ -345,16 +389,13 @@ BEHAVIORAL INTERVIEW GUIDANCE:
             return True  # Skip validation if no secret is set
         
         try:
-            import hmac
-            import hashlib
-            
-            expected_signature = hmac.new(
-                self.webhook_secret.encode('utf-8'),
-                payload.encode('utf-8'),
-                hashlib.sha256
-            ).hexdigest()
+            prefix, _, received_hex = signature.partition('sha256=')
+            if prefix:
+                return False
             
-            return hmac.compare_digest(f"sha256={expected_signature}", signature)
+            # Compare raw 32-byte digests; malformed hex raises and is rejected below
+            expected_signature = hmac.new(self._webhook_key, payload, hashlib.sha256).digest()
+            return hmac.compare_digest(expected_signature, bytes.fromhex(received_hex))
             
         except Exception as e:
             logging.error(f"Error validating webhook signature: {e}")
@@ -380,7 +421,7 @@ if __name__ == "__main__":
     )
     
     print("VAPI Assistant Configuration:")
-    print(json.dumps(config, indent=2))
+    print(orjson.dumps(config, option=orjson.OPT_INDENT_2).decode())
     
     # Test webhook handling
     sample_webhook = {
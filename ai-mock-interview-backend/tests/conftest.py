@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database and a dummy LLM key before the
+# app modules are imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("LLM_API_KEY", "test-key")
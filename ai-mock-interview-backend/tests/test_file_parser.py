@@ -0,0 +1,41 @@
+import codecs
+import pytest
+from app import file_parser
+from app.file_parser import FileParser, text_cache_key, get_cached_text, cache_text
+
+@pytest.mark.parametrize('text', [
+    'héllo wörld résumé',
+    'Je suis ingénieur logiciel à Paris, expérience en développement et qualité.',
+])
+def test_txt_cp1252(text):
+    assert FileParser.extract_text_from_txt(text.encode('cp1252')) == text
+
+def test_txt_utf8_with_bom():
+    content = codecs.BOM_UTF8 + 'Senior engineer — résumé'.encode('utf-8')
+    assert FileParser.extract_text_from_txt(content) == 'Senior engineer — résumé'
+
+def test_txt_detected_encoding():
+    text = 'Привет, меня зовут Иван, я инженер-программист с опытом работы'
+    assert FileParser.extract_text_from_txt(text.encode('cp1251')) == text
+
+def test_txt_utf16_with_bom():
+    assert FileParser.extract_text_from_txt('Software engineer résumé'.encode('utf-16')) == 'Software engineer résumé'
+
+def test_text_cache_key_depends_on_content_and_extension():
+    assert text_cache_key(b'resume', 'cv.TXT') == text_cache_key(b'resume', 'other.txt')
+    assert text_cache_key(b'resume', 'cv.txt') != text_cache_key(b'resume', 'cv.pdf')
+    assert text_cache_key(b'resume', 'cv.txt') != text_cache_key(b'resume 2', 'cv.txt')
+
+def test_text_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(file_parser, 'TEXT_CACHE_SIZE', 2)
+    monkeypatch.setattr(file_parser, '_text_cache', type(file_parser._text_cache)())
+    first, second, third = (text_cache_key(data, 'cv.txt') for data in (b'1', b'2', b'3'))
+
+    cache_text(first, 'one')
+    cache_text(second, 'two')
+    assert get_cached_text(first) == 'one'
+    cache_text(third, 'three')
+
+    assert get_cached_text(second) is None
+    assert get_cached_text(first) == 'one'
+    assert get_cached_text(third) == 'three'
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import Mock, patch
 from app.ml_service import InterviewAnalyzer
@@ -34,3 +35,23 @@ def test_analyze_response_structure(analyzer):
     assert "rating" in result
     assert "scores" in result
     assert result["overall_score"] == 85
+
+def test_batch_analyze_async_bounds_concurrency(analyzer):
+    in_flight = 0
+    peak = 0
+
+    async def fake_analyze(response_text, question_text='', interview_type='technical_software'):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"response": response_text}
+
+    analyzer.analyze_response_async = fake_analyze
+    responses = [{"response_text": f"answer {i}"} for i in range(10)]
+
+    results = asyncio.run(analyzer.batch_analyze_async(responses, max_concurrency=3))
+
+    assert [r["response"] for r in results] == [f"answer {i}" for i in range(10)]
+    assert peak == 3
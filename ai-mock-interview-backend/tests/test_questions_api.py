@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import main
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+def test_questions_etag_revalidation(client):
+    first = client.get('/api/questions/behavioral')
+    assert first.status_code == 200
+    etag = first.headers['etag']
+    assert first.headers['cache-control'] == 'private, no-cache'
+
+    cached = client.get('/api/questions/behavioral', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert cached.headers['etag'] == etag
+
+    listed = client.get('/api/questions/behavioral', headers={'If-None-Match': f'W/"other", {etag}'})
+    assert listed.status_code == 304
+
+    stale = client.get('/api/questions/behavioral', headers={'If-None-Match': 'W/"other"'})
+    assert stale.status_code == 200
+
+def test_questions_etag_differs_by_filter(client):
+    all_levels = client.get('/api/questions/behavioral').headers['etag']
+    entry = client.get('/api/questions/behavioral', params={'difficulty': 'entry'}).headers['etag']
+    assert all_levels != entry
+
+def test_questions_non_ascii_filter(client):
+    response = client.get('/api/questions/行为', params={'company': 'a"b'})
+    assert response.status_code == 200
+    assert response.json() == {'questions': [], 'count': 0}
+    assert response.headers['etag'].isascii()
+
+def test_clear_cache_requires_admin_token(client, monkeypatch):
+    monkeypatch.setattr(main, 'ADMIN_API_TOKEN', 'secret')
+
+    assert client.post('/api/admin/questions/cache/clear').status_code == 401
+    response = client.post('/api/admin/questions/cache/clear', headers={'X-Admin-Token': 'wrong'})
+    assert response.status_code == 401
+
+    response = client.post('/api/admin/questions/cache/clear', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    assert response.json() == {'status': 'cleared'}
+
+def test_clear_cache_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(main, 'ADMIN_API_TOKEN', None)
+    response = client.post('/api/admin/questions/cache/clear', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 403
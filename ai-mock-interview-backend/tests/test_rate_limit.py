@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app import rate_limit
+from app.rate_limit import RequestThrottle
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_requests_within_limit_start_immediately(clock):
+    throttle = RequestThrottle(3)
+    assert [throttle._reserve() for _ in range(3)] == [0, 0, 0]
+
+def test_requests_over_limit_wait_for_the_window(clock):
+    throttle = RequestThrottle(2)
+    assert throttle._reserve() == 0
+    clock[0] += 10
+    assert throttle._reserve() == 0
+
+    # The third and fourth requests start a minute after the first and second
+    assert throttle._reserve() == 50
+    assert throttle._reserve() == 60
+
+    # Queued slots count against the window until they are a minute old
+    clock[0] += 60
+    assert throttle._reserve() == 50
+    clock[0] += 120
+    assert throttle._reserve() == 0
+
+def test_disabled_throttle_never_waits(clock, monkeypatch):
+    slept = []
+    monkeypatch.setattr(rate_limit.asyncio, 'sleep', lambda delay: slept.append(delay))
+    throttle = RequestThrottle(0)
+
+    asyncio.run(throttle.wait())
+    throttle.wait_sync()
+
+    assert slept == []
+    assert not throttle._started
+
+def test_wait_sleeps_for_reserved_delay(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr(rate_limit.asyncio, 'sleep', fake_sleep)
+    throttle = RequestThrottle(1)
+
+    async def go():
+        await throttle.wait()
+        await throttle.wait()
+
+    asyncio.run(go())
+    assert slept == [60]
@@ -0,0 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app import main
+from app.file_parser import FileParser
+
+RESUME = b'Experienced engineer with Python, FastAPI and PostgreSQL. Led a team of five. ' * 2
+
+class FakeResumeAnalyzer:
+    async def analyze_resume_async(self, resume_text, job_description='', target_role=''):
+        return {"overall_score": 80, "ats_score": 80, "rating": "Good", "category_scores": {},
+                "key_strengths": [], "critical_issues": [], "missing_sections": [], "keyword_analysis": {},
+                "formatting_issues": [], "recommendations": [], "summary": resume_text[:20]}
+
+    async def aclose(self):
+        pass
+
+def test_resubmitted_resume_is_parsed_once():
+    extracted = []
+    parse = FileParser.extract_text
+
+    def extract_text(file_content, filename):
+        extracted.append(filename)
+        return parse(file_content, filename)
+
+    with patch.object(main, 'get_resume_analyzer', return_value=FakeResumeAnalyzer()), \
+            patch.object(main.FileParser, 'extract_text', side_effect=extract_text), \
+            TestClient(main.app) as client:
+        # Parse in threads so the patched parser is visible
+        main.app.state.resume_pool.shutdown()
+        main.app.state.resume_pool = ThreadPoolExecutor(max_workers=1)
+
+        first = client.post('/api/resume/analyze', files={'file': ('cv.txt', RESUME)})
+        second = client.post('/api/resume/analyze', files={'file': ('copy.txt', RESUME)})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert extracted == ['cv.txt']
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from app import main
+
+class FakeResumeAnalyzer:
+    def __init__(self):
+        self.calls = []
+
+    async def analyze_resume_async(self, resume_text, job_description='', target_role=''):
+        self.calls.append((resume_text, job_description, target_role))
+        if resume_text == 'boom':
+            raise RuntimeError('LLM unavailable')
+        return {'resume': resume_text, 'role': target_role}
+
+def run_batch(analyzer, requests):
+    async def go():
+        loop = asyncio.get_running_loop()
+        items = [(args, loop.create_future()) for args in requests]
+        with patch.object(main, 'get_resume_analyzer', return_value=analyzer):
+            await main._run_resume_batch(items)
+        return [future for _, future in items]
+    return asyncio.run(go())
+
+def test_each_caller_gets_its_own_result():
+    analyzer = FakeResumeAnalyzer()
+    futures = run_batch(analyzer, [('alice', '', 'SWE'), ('bob', '', 'PM'), ('carol', '', 'DS')])
+
+    assert [f.result() for f in futures] == [
+        {'resume': 'alice', 'role': 'SWE'},
+        {'resume': 'bob', 'role': 'PM'},
+        {'resume': 'carol', 'role': 'DS'},
+    ]
+    # One completion per distinct request
+    assert len(analyzer.calls) == 3
+
+def test_identical_requests_share_one_call():
+    analyzer = FakeResumeAnalyzer()
+    futures = run_batch(analyzer, [('alice', '', 'SWE'), ('bob', '', ''), ('alice', '', 'SWE')])
+
+    assert futures[0].result() == futures[2].result() == {'resume': 'alice', 'role': 'SWE'}
+    assert analyzer.calls.count(('alice', '', 'SWE')) == 1
+
+def test_failure_only_reaches_its_own_caller():
+    futures = run_batch(FakeResumeAnalyzer(), [('boom', '', ''), ('bob', '', '')])
+
+    with pytest.raises(RuntimeError):
+        futures[0].result()
+    assert futures[1].result() == {'resume': 'bob', 'role': ''}
@@ -0,0 +1,42 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.resume_service import ATSResumeAnalyzer
+
+@pytest.fixture
+def analyzer():
+    with patch('app.resume_service.OpenAI'):
+        resume_analyzer = ATSResumeAnalyzer()
+    resume_analyzer._async_client = Mock()
+    return resume_analyzer
+
+def completion(payload):
+    mock_completion = Mock()
+    mock_completion.choices = [Mock()]
+    mock_completion.choices[0].message.content = json.dumps(payload)
+    return mock_completion
+
+def test_batch_results_are_routed_by_resume_number(analyzer):
+    # The model answers out of order; each result still reaches its own resume
+    analyzer.aclient.chat.completions.create = AsyncMock(return_value=completion({"results": [
+        {"resume_number": 2, "ats_score": 62},
+        {"resume_number": 1, "ats_score": 91},
+    ]}))
+
+    results = asyncio.run(analyzer.analyze_resumes_batch([("first", "", ""), ("second", "", "")]))
+
+    assert [r["ats_score"] for r in results] == [91, 62]
+    assert analyzer.aclient.chat.completions.create.await_count == 1
+
+def test_unnumbered_batch_reply_falls_back_to_single_calls(analyzer):
+    analyzer.aclient.chat.completions.create = AsyncMock(side_effect=[
+        completion({"results": [{"ats_score": 91}, {"ats_score": 62}]}),
+        completion({"ats_score": 75}),
+        completion({"ats_score": 75}),
+    ])
+
+    results = asyncio.run(analyzer.analyze_resumes_batch([("first", "", ""), ("second", "", "")]))
+
+    assert [r["ats_score"] for r in results] == [75, 75]
+    assert analyzer.aclient.chat.completions.create.await_count == 3
@@ -0,0 +1,55 @@
+import hmac
+import hashlib
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app import main
+from app.vapi_service import VAPIManager, _ASSISTANT_TEMPLATE
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setenv('VAPI_PRIVATE_KEY', 'test-key')
+    monkeypatch.setenv('VAPI_WEBHOOK_SECRET', 'webhook-secret')
+    return VAPIManager()
+
+def test_assistant_config_does_not_share_template(manager):
+    config = manager.create_assistant_config('s1', 'behavioral', ['Tell me about yourself'])
+    config['voice']['voiceId'] = 'changed'
+    config['functions'].clear()
+
+    assert _ASSISTANT_TEMPLATE['voice']['voiceId'] != 'changed'
+    assert _ASSISTANT_TEMPLATE['functions']
+    assert _ASSISTANT_TEMPLATE['model']['systemMessage'] is None
+
+    other = manager.create_assistant_config('s2', 'behavioral', ['Tell me about yourself'])
+    assert other['voice'] is not config['voice']
+    assert other['functions']
+
+def sign(payload, secret='webhook-secret'):
+    return 'sha256=' + hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).hexdigest()
+
+def test_webhook_signature_accepts_valid_hmac(manager):
+    payload = b'{"type": "call-started", "call": {"id": "c1"}}'
+    assert manager.validate_webhook_signature(payload, sign(payload))
+
+@pytest.mark.parametrize('signature', [
+    sign(b'{"type": "call-ended"}'),
+    sign(b'{"type": "call-started", "call": {"id": "c1"}}', secret='other-secret'),
+    sign(b'{"type": "call-started", "call": {"id": "c1"}}').removeprefix('sha256='),
+    'sha256=not-hex',
+    'sha256=',
+    '',
+])
+def test_webhook_signature_rejects_invalid_hmac(manager, signature):
+    payload = b'{"type": "call-started", "call": {"id": "c1"}}'
+    assert not manager.validate_webhook_signature(payload, signature)
+
+def test_webhook_signature_skipped_without_secret(monkeypatch):
+    monkeypatch.delenv('VAPI_WEBHOOK_SECRET', raising=False)
+    assert VAPIManager().validate_webhook_signature(b'{}', '')
+
+def test_webhook_endpoint_rejects_bad_signature(manager):
+    payload = b'{"type": "call-started", "call": {"id": "c1"}}'
+    with patch.object(main, 'get_vapi_manager', return_value=manager), TestClient(main.app) as client:
+        response = client.post('/api/vapi/webhook', content=payload, headers={'X-Vapi-Signature': sign(b'{}')})
+    assert response.status_code == 401